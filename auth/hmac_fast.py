@@ -0,0 +1,87 @@
+import base64
+import hashlib
+import hmac
+import time
+import orjson
+from typing import Optional
+
+_BLOCK_SIZE = 64  # SHA-256 block size in bytes
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class HS256Verifier:
+    """
+    HS256 verifier with the HMAC key schedule computed once.
+
+    The secret never changes for the lifetime of the process, so the inner
+    (key ^ ipad) and outer (key ^ opad) SHA-256 states are hashed up front and
+    only copied per token instead of being rebuilt on every verify.
+    """
+
+    def __init__(self, key: bytes):
+        if len(key) > _BLOCK_SIZE:
+            key = hashlib.sha256(key).digest()
+        key = key.ljust(_BLOCK_SIZE, b"\0")
+        self._inner = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+        self._outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+
+    def sign(self, signing_input: bytes) -> bytes:
+        inner = self._inner.copy()
+        inner.update(signing_input)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def decode(self, token: str) -> Optional[dict]:
+        """Verify signature and exp/nbf claims, return payload or None"""
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            payload = orjson.loads(_b64url_decode(payload_b64))
+        except (ValueError, TypeError):
+            return None
+
+        # Claims are checked before any crypto so stale tokens are rejected
+        # cheaply; nothing from the payload is trusted until the MAC matches.
+        if not isinstance(payload, dict) or not claims_are_current(payload):
+            return None
+
+        try:
+            header = orjson.loads(_b64url_decode(header_b64))
+            if not isinstance(header, dict) or header.get("alg") != "HS256":
+                return None
+
+            signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+            if not hmac.compare_digest(self.sign(signing_input), _b64url_decode(signature_b64)):
+                return None
+        except (ValueError, TypeError):
+            return None
+
+        return payload
+
+
+def peek_claims(token: str) -> Optional[dict]:
+    """
+    Decode the payload segment of a JWT WITHOUT verifying its signature.
+    Only use the result to reject a token early, never to trust it.
+    """
+    try:
+        payload = orjson.loads(_b64url_decode(token.split(".")[1]))
+    except (ValueError, TypeError, IndexError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def claims_are_current(payload: dict) -> bool:
+    """Check exp/nbf against the current time"""
+    now = time.time()
+    try:
+        if "exp" in payload and float(payload["exp"]) <= now:
+            return False
+        if "nbf" in payload and float(payload["nbf"]) > now:
+            return False
+    except (ValueError, TypeError):
+        return False
+    return True
@@ -1,26 +1,79 @@
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from datetime import datetime, timedelta, timezone
+import hashlib
+import threading
+import time
+from cachetools import TTLCache
+import jwt
+from jwt import InvalidTokenError as JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config import settings
+from auth.hmac_fast import HS256Verifier, peek_claims, claims_are_current
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Settings are fixed for the process lifetime, bind them once for the hot path
+_JWT_SECRET_BYTES = settings.JWT_SECRET.encode()
+_ALG = settings.JWT_ALGORITHM
+_ALGS = [_ALG]
+_DEFAULT_TTL = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# HS256 fast path with the HMAC key schedule precomputed
+_hs256 = HS256Verifier(_JWT_SECRET_BYTES) if _ALG == "HS256" else None
+
+# Short-lived cache of verified payloads, keyed by a hash of the token so the
+# raw token is never held in memory. Failures are never cached here.
+_payload_cache = TTLCache(maxsize=10000, ttl=5)
+_payload_cache_lock = threading.Lock()
+
+# Separate, much shorter-lived cache of tokens that failed verification so a
+# flood of the same bad token costs one hash lookup each.
+_neg_cache = TTLCache(maxsize=1024, ttl=1)
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()[:16]
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or _DEFAULT_TTL)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(to_encode, _JWT_SECRET_BYTES, algorithm=_ALG)
 
 def verify_token(token: str) -> dict:
     """Verify JWT token and return payload"""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
+    key = _token_key(token)
+    with _payload_cache_lock:
+        if key in _neg_cache:
+            return None
+        cached = _payload_cache.get(key)
+    if cached is not None and cached.get("exp", 0) > time.time():
+        # Each caller gets its own copy; the cached dict is shared across requests
+        return dict(cached)
+
+    if _hs256 is not None:
+        # Checks exp/nbf before computing the HMAC
+        payload = _hs256.decode(token)
+    else:
+        # Reject expired tokens from the unverified claims before paying for a full verify
+        claims = peek_claims(token)
+        if claims is None or not claims_are_current(claims):
+            payload = None
+        else:
+            try:
+                payload = jwt.decode(token, _JWT_SECRET_BYTES, algorithms=_ALGS)
+            except JWTError:
+                payload = None
+
+    if payload is None:
+        with _payload_cache_lock:
+            _neg_cache[key] = True
         return None
 
+    with _payload_cache_lock:
+        _payload_cache[key] = payload
+    return dict(payload)
+
 def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """Get current user from JWT token"""
     payload = verify_token(token)
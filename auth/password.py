@@ -0,0 +1,42 @@
+import asyncio
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# Shared password hashing context.
+# New hashes use argon2id (OWASP minimum parameters), which costs far less CPU per
+# login than bcrypt at 12 rounds. Existing bcrypt hashes still verify and are
+# upgraded to argon2 on the next successful login (see verify_and_update).
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
+
+# Hash of a random secret nobody knows. Login verifies against it when the email is
+# unknown, so a miss costs the same as a wrong password and timing doesn't reveal
+# which accounts exist.
+DUMMY_PASSWORD_HASH = pwd_context.hash(secrets.token_urlsafe(16))
+
+# Dedicated pool for hashing, sized to the cores. argon2-cffi and bcrypt release the
+# GIL while hashing, so threads run in parallel, and a burst of logins queues here
+# instead of occupying the shared threadpool that sync routes run on.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwhash")
+
+
+async def hash_password(password: str) -> str:
+    """pwd_context.hash on the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+
+async def verify_and_update_password(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """pwd_context.verify_and_update on the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify_and_update, password, password_hash)
@@ -1,7 +1,13 @@
-from pydantic_settings import BaseSettings
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DB_URL: str
+    # Optional read replica for read-only endpoints (falls back to DB_URL)
+    READ_DB_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # seconds, below MySQL's wait_timeout
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 180
@@ -16,15 +22,21 @@ class Settings(BaseSettings):
     
     # Environment
     ENVIRONMENT: str = "development"
+    # Run Base.metadata.create_all on startup (local convenience; schema comes from import.sql + migrations/)
+    AUTO_CREATE_TABLES: bool = False
 
     UPLOAD_URL: str
+    # Extra libmagic sniff on uploads; Pillow's format-restricted decode is the default check
+    STRICT_MIME_CHECK: bool = False
 
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_SES_REGION: str
     SES_FROM_EMAIL: str
+    # Send via SES stored templates (see functions/send_mail.sync_ses_templates)
+    SES_USE_TEMPLATES: bool = False
 
-    class Config:
-        env_file = ".env"
+    # Single canonical settings object; frozen so it can be safely cached at module level
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
 
 settings = Settings()
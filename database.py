@@ -3,13 +3,37 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
-engine = create_engine(settings.DB_URL)
+# Explicit pool sizing: sync routes run in the threadpool, so concurrent requests
+# each hold a connection. pre_ping drops connections MySQL closed on wait_timeout,
+# recycle keeps them below it. LIFO reuses the most recently returned (warm)
+# connection and lets surplus ones idle out after a burst.
+_POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True,
+)
+
+engine = create_engine(settings.DB_URL, **_POOL_OPTIONS)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# Read-only endpoints can go to a replica; without READ_DB_URL they share the primary pool
+read_engine = create_engine(settings.READ_DB_URL, **_POOL_OPTIONS) if settings.READ_DB_URL else engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session for endpoints that never write; bound to the replica when configured"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
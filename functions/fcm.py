@@ -1,11 +1,43 @@
 import firebase_admin
 from firebase_admin import credentials, messaging
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
 import logging
 from pathlib import Path
 
+__all__ = ["FCMService"]
+
 logger = logging.getLogger("chosen_api")
 
+# Shared `extra` for colored log lines, avoids a dict allocation per log call
+_COLOR_EXTRA = {'color': True}
+
+# FCM accepts at most 500 tokens per multicast request
+MULTICAST_BATCH_SIZE = 500
+
+# Static part of every chat notification data payload
+_DATA_TEMPLATE = {
+    "type": "chat_message",
+    "click_action": "FLUTTER_NOTIFICATION_CLICK",
+}
+
+# Platform configs never change between notifications, build them once.
+# The SDK only serializes these, it never mutates them.
+_ANDROID_CFG = messaging.AndroidConfig(
+    priority="high",
+)
+_APNS_CFG = messaging.APNSConfig(
+    headers={"apns-priority": "10"},
+    payload=messaging.APNSPayload(
+        aps=messaging.Aps(
+            content_available=True,
+            sound="default",
+            badge=1,
+            category="CHAT_MESSAGE",
+        ),
+    ),
+)
+
 class FCMService:
     _initialized = False
     
@@ -15,6 +47,11 @@ class FCMService:
         if cls._initialized:
             return
         
+        # Reuse an app that is already registered with the SDK (e.g. module re-import)
+        if firebase_admin._apps:
+            cls._initialized = True
+            return
+        
         try:
             # Use the existing Firebase Admin SDK credentials file
             cred_path = Path(__file__).parent.parent / "firebaseCreds.json"
@@ -30,6 +67,19 @@ class FCMService:
         except Exception as e:
             logger.error(f"❌ Failed to initialize Firebase Admin SDK: {e}", extra={'color': True})
     
+    @staticmethod
+    def _build_message_data(sender_name: str, message_body: str, thread_id: int, sender_id: int) -> dict:
+        """Build the data payload shared by single and multicast chat notifications"""
+        # Truncate message if too long
+        preview = message_body[:100] + "..." if len(message_body) > 100 else message_body
+        return _DATA_TEMPLATE | {
+            "conversation_id": (tid := str(thread_id)),  # Match Flutter's expected field name
+            "thread_id": tid,  # Keep for backwards compatibility
+            "sender_id": str(sender_id),
+            "title": sender_name,  # Pass title in data for Flutter to use
+            "body": preview,  # Pass body in data for Flutter to use
+        }
+    
     @staticmethod
     def send_message_notification(
         fcm_token: str,
@@ -56,50 +106,61 @@ class FCMService:
             return False
         
         try:
-            # Truncate message if too long
-            preview = message_body[:100] + "..." if len(message_body) > 100 else message_body
-            
             # Build data-only payload (no notification field to prevent duplicates)
             # Flutter will handle displaying the notification via local notifications
             message = messaging.Message(
-                data={
-                    "type": "chat_message",
-                    "conversation_id": str(thread_id),  # Match Flutter's expected field name
-                    "thread_id": str(thread_id),  # Keep for backwards compatibility
-                    "sender_id": str(sender_id),
-                    "title": sender_name,  # Pass title in data for Flutter to use
-                    "body": preview,  # Pass body in data for Flutter to use
-                    "click_action": "FLUTTER_NOTIFICATION_CLICK",
-                },
+                data=FCMService._build_message_data(sender_name, message_body, thread_id, sender_id),
                 token=fcm_token,
-                android=messaging.AndroidConfig(
-                    priority="high",
-                ),
-                apns=messaging.APNSConfig(
-                    headers={"apns-priority": "10"},
-                    payload=messaging.APNSPayload(
-                        aps=messaging.Aps(
-                            content_available=True,
-                            sound="default",
-                            badge=1,
-                            category="CHAT_MESSAGE",
-                        ),
-                    ),
-                ),
+                android=_ANDROID_CFG,
+                apns=_APNS_CFG,
             )
             
             # Send the message
             response = messaging.send(message)
-            logger.info(f"✅ FCM notification sent successfully: {response}", extra={'color': True})
+            logger.info("✅ FCM notification sent successfully: %s", response, extra=_COLOR_EXTRA)
             return True
             
         except messaging.UnregisteredError:
-            logger.warning(f"⚠️ FCM token is invalid or unregistered: {fcm_token[:20]}...")
+            logger.warning("⚠️ FCM token is invalid or unregistered: %s...", fcm_token[:20])
             return False
         except Exception as e:
-            logger.error(f"❌ Failed to send FCM notification: {e}", extra={'color': True})
+            logger.error("❌ Failed to send FCM notification: %s", e, extra=_COLOR_EXTRA)
             return False
     
+    @staticmethod
+    def _build_multicast_messages(
+        fcm_tokens: List[str],
+        sender_name: str,
+        message_body: str,
+        thread_id: int,
+        sender_id: int
+    ) -> List[messaging.MulticastMessage]:
+        """Split tokens into multicast messages of up to 500 devices each"""
+        data = FCMService._build_message_data(sender_name, message_body, thread_id, sender_id)
+        return [
+            messaging.MulticastMessage(
+                tokens=fcm_tokens[start:start + MULTICAST_BATCH_SIZE],
+                data=data,
+                android=_ANDROID_CFG,
+                apns=_APNS_CFG,
+            )
+            for start in range(0, len(fcm_tokens), MULTICAST_BATCH_SIZE)
+        ]
+    
+    @staticmethod
+    def _send_multicast(multicast: messaging.MulticastMessage) -> Tuple[int, int]:
+        """Send one multicast batch, returns (success_count, failure_count)"""
+        try:
+            response = messaging.send_each_for_multicast(multicast)
+        except Exception as e:
+            logger.error("❌ Failed to send FCM multicast batch: %s", e, extra=_COLOR_EXTRA)
+            return 0, len(multicast.tokens)
+        
+        for token, result in zip(multicast.tokens, response.responses):
+            if isinstance(result.exception, messaging.UnregisteredError):
+                logger.warning("⚠️ FCM token is invalid or unregistered: %s...", token[:20])
+        return response.success_count, response.failure_count
+    
     @staticmethod
     def send_bulk_notifications(
         fcm_tokens: List[str],
@@ -121,11 +182,45 @@ class FCMService:
         success_count = 0
         failure_count = 0
         
-        for token in fcm_tokens:
-            if FCMService.send_message_notification(token, sender_name, message_body, thread_id, sender_id):
-                success_count += 1
-            else:
-                failure_count += 1
+        # One multicast request per chunk of up to 500 tokens instead of one request per device
+        for multicast in FCMService._build_multicast_messages(
+            fcm_tokens, sender_name, message_body, thread_id, sender_id
+        ):
+            sent, failed = FCMService._send_multicast(multicast)
+            success_count += sent
+            failure_count += failed
+        
+        logger.info("📊 Bulk FCM: %d sent, %d failed", success_count, failure_count, extra=_COLOR_EXTRA)
+        return {"success_count": success_count, "failure_count": failure_count}
+    
+    @staticmethod
+    async def send_bulk_notifications_async(
+        fcm_tokens: List[str],
+        sender_name: str,
+        message_body: str,
+        thread_id: int,
+        sender_id: int
+    ) -> dict:
+        """
+        Async variant of send_bulk_notifications for use from async routes.
+        All multicast batches are sent concurrently in worker threads, so the
+        total time is roughly that of the slowest batch.
+        
+        Returns:
+            dict: {"success_count": int, "failure_count": int}
+        """
+        if not FCMService._initialized:
+            logger.warning("FCM not initialized, skipping bulk notifications")
+            return {"success_count": 0, "failure_count": len(fcm_tokens)}
+        
+        multicasts = FCMService._build_multicast_messages(
+            fcm_tokens, sender_name, message_body, thread_id, sender_id
+        )
+        results = await asyncio.gather(
+            *(asyncio.to_thread(FCMService._send_multicast, multicast) for multicast in multicasts)
+        )
+        success_count = sum(sent for sent, _ in results)
+        failure_count = sum(failed for _, failed in results)
         
-        logger.info(f"📊 Bulk FCM: {success_count} sent, {failure_count} failed", extra={'color': True})
+        logger.info("📊 Bulk FCM: %d sent, %d failed", success_count, failure_count, extra=_COLOR_EXTRA)
         return {"success_count": success_count, "failure_count": failure_count}
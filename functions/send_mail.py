@@ -1,113 +1,207 @@
 from config import settings  # optional
-import boto3
+import aioboto3
+import asyncio
+import html
+import json
+import re
+import time
+from aiolimiter import AsyncLimiter
+from aiobotocore.config import AioConfig
 import secrets
 from datetime import datetime, timedelta, timezone
+from email.headerregistry import Address
+from email.message import EmailMessage
+from email.policy import SMTP
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+# Email templates are compiled once at import; HTML ones are auto-escaped
+_TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+_env = Environment(
+    loader=FileSystemLoader(str(_TEMPLATES_DIR)),
+    autoescape=select_autoescape(["html", "html.j2"]),
+)
+_welcome_text = _env.get_template("welcome.txt.j2")
+_welcome_html = _env.get_template("welcome.html.j2")
+_reset_text = _env.get_template("reset.txt.j2")
+_reset_html = _env.get_template("reset.html.j2")
+
+
+# SES configuration, read from settings once at import
+_SES_REGION = settings.AWS_SES_REGION
+_SES_ACCESS_KEY_ID = settings.AWS_ACCESS_KEY_ID
+_SES_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY
+_SES_FROM_EMAIL = settings.SES_FROM_EMAIL
+_SES_USE_TEMPLATES = settings.SES_USE_TEMPLATES
+
+WELCOME_SUBJECT = "Dobrodošli u Chosen International - Vaši pristupni podaci"
+RESET_SUBJECT = "Chosen International - Zahtjev za resetiranje lozinke"
+
+# SES server-side templates, synced from templates/*.j2 by sync_ses_templates().
+# The .j2 files only use plain {{ var }} placeholders, which SES (Handlebars) understands too.
+WELCOME_TEMPLATE_NAME = "welcome_hr"
+RESET_TEMPLATE_NAME = "password_reset_hr"
+
+SES_TEMPLATES = {
+    WELCOME_TEMPLATE_NAME: (WELCOME_SUBJECT, "welcome.txt.j2", "welcome.html.j2"),
+    RESET_TEMPLATE_NAME: (RESET_SUBJECT, "reset.txt.j2", "reset.html.j2"),
+}
+
+
+# Pre-built raw MIME messages: the templates are rendered once with @@T:field@@ (text)
+# and @@H:field@@ (HTML) tokens, and only those tokens are substituted per send
+_RAW_TOKEN = re.compile(rb"@@([TH]):(\w+)@@")
+
+
+def _build_raw_message(subject, text_template, html_template, fields) -> bytes:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = _SES_FROM_EMAIL
+    # 8bit keeps the tokens literal instead of base64/QP-encoding the bodies
+    msg.set_content(text_template.render({f: f"@@T:{f}@@" for f in fields}), cte="8bit")
+    msg.add_alternative(html_template.render({f: f"@@H:{f}@@" for f in fields}), subtype="html", cte="8bit")
+    return msg.as_bytes(policy=SMTP)
+
+
+def _recipient_address(email: str) -> Address:
+    """
+    Parse a recipient into an ASCII-only Address for the raw MIME header and SES.
+    Raises ValueError on CR/LF (header injection) or a non-ASCII local part.
+    """
+    if "\r" in email or "\n" in email:
+        raise ValueError("Recipient address contains a line break")
+    address = Address(addr_spec=email.strip())
+    if not address.domain.isascii():
+        address = Address(username=address.username, domain=address.domain.encode("idna").decode("ascii"))
+    return address
+
+
+def _fill_raw_message(raw: bytes, to: Address, **values) -> bytes:
+    """Substitute per-recipient values in a single pass; HTML parts are escaped."""
+    for name, value in values.items():
+        if "\r" in value or "\n" in value:
+            raise ValueError(f"Value for {name} contains a line break")
+
+    def _sub(match):
+        value = values[match.group(2).decode()]
+        if match.group(1) == b"H":
+            value = html.escape(value)
+        return value.encode()
+
+    # The To header goes through the email policy, never a hand-formatted line
+    to_header = SMTP.fold_binary("To", SMTP.header_factory("To", to))
+    return to_header + _RAW_TOKEN.sub(_sub, raw)
+
+
+_RAW_WELCOME = _build_raw_message(WELCOME_SUBJECT, _welcome_text, _welcome_html, ("first_name", "email", "password"))
+_RAW_RESET = _build_raw_message(RESET_SUBJECT, _reset_text, _reset_html, ("first_name", "reset_url"))
+
+
+# Keep the HTTPS connections to SES pooled for the worker's lifetime
+# Adaptive retries so botocore's own token bucket backs off together with ours
+_SES_CLIENT_CONFIG = AioConfig(
+    retries={"mode": "adaptive", "max_attempts": 5},
+    max_pool_connections=50,
+)
+
+_session = aioboto3.Session()
+
+# Persistent async SES client and the event loop it lives on,
+# opened on app startup by open_ses_client()
+_ses = None
+_loop = None
+_pending = set()
+
+# Client-side rate limit matching the account's SES MaxSendRate, so bursts
+# wait locally instead of hitting Throttling errors and SDK retries.
+# The quota is fetched on startup and refreshed every 30 minutes, never per send.
+_DEFAULT_SEND_RATE = 1.0  # SES sandbox rate, used until the quota is known
+_SEND_RATE_REFRESH_SECONDS = 30 * 60
+_limiter = AsyncLimiter(_DEFAULT_SEND_RATE, 1)
+_send_rate_checked_at = 0.0
+
+
+def _new_ses_client():
+    return _session.client(
+        "ses",
+        region_name=_SES_REGION,
+        aws_access_key_id=_SES_ACCESS_KEY_ID,
+        aws_secret_access_key=_SES_SECRET_ACCESS_KEY,
+        config=_SES_CLIENT_CONFIG,
+    )
+
+
+async def open_ses_client():
+    """Open the shared SES client (call once on app startup)."""
+    global _ses, _loop
+    if _ses is None:
+        _ses = await _new_ses_client().__aenter__()
+        _loop = asyncio.get_running_loop()
+        await _refresh_send_rate()
+    return _ses
+
 
-def send_welcome_email(first_name:str, email: str, password: str):
+async def _refresh_send_rate():
+    global _limiter, _send_rate_checked_at
+    _send_rate_checked_at = time.monotonic()
+    try:
+        quota = await _ses.get_send_quota()
+        rate = float(quota["MaxSendRate"])
+        if rate > 0 and rate != _limiter.max_rate:
+            _limiter = AsyncLimiter(rate, 1)
+    except Exception as e:
+        print(f"Error fetching SES send quota: {e}")
+
+
+async def _wait_for_send_slot():
+    """Wait until the SES send rate allows one more message."""
+    if time.monotonic() - _send_rate_checked_at > _SEND_RATE_REFRESH_SECONDS:
+        await _refresh_send_rate()
+    await _limiter.acquire()
+
+
+async def close_ses_client():
+    """Wait for queued emails and close the shared SES client (call on shutdown)."""
+    global _ses, _loop
+    if _pending:
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in list(_pending)), return_exceptions=True)
+    if _ses is not None:
+        await _ses.__aexit__(None, None, None)
+    _ses = None
+    _loop = None
+
+
+async def send_welcome_email(first_name:str, email: str, password: str):
     """
     Sends a welcome email with credentials using AWS SES.
     Includes both HTML and Plain Text versions.
     """
     
-    # Initialize SES Client
-    ses = boto3.client(
-        "ses",
-        region_name=settings.AWS_SES_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
-
-    # Translated Subject
-    subject = "Dobrodošli u Chosen International - Vaši pristupni podaci"
-
-    # 1. Plain Text Version (Fallback)
-    text_body = f"""
-Pozdrav {first_name},
-
-Dobrodošli u Chosen International. Vaš korisnički račun je uspješno kreiran.
-
-Ovo su Vaši podaci za prijavu:
-----------------------------
-E-mail: {email}
-Lozinka: {password}
-----------------------------
-
-Radi Vaše sigurnosti, molimo Vas da odmah promijenite lozinku u mobilnoj aplikaciji.
-
-Lijep pozdrav,
-Chosen International Tim
-"""
-
-    # 2. HTML Version (Design)
-    # We inject the {email} and {password} variables into the template using f-string
-    html_body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<style>
-    body, td {{ font-family: 'Avenir', 'Segoe UI', 'Roboto', Helvetica, Arial, sans-serif; }}
-</style>
-</head>
-<body style="background-color: #f4f4f4; margin: 0; padding: 20px;">
-    <table border="0" cellpadding="0" cellspacing="0" width="100%">
-        <tr>
-            <td align="center">
-                <table border="0" cellpadding="0" cellspacing="0" width="600" style="background-color: #ffffff; max-width: 600px; width: 100%; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                    <tr>
-                        <td align="center" style="background-color: #000000; padding: 30px 20px;">
-                            <h1 style="color: #ffffff; margin: 0; font-size: 24px; letter-spacing: 2px; text-transform: uppercase; font-weight: 500;">
-                                CHOSEN INTERNATIONAL
-                            </h1>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 40px;">
-                            <h2 style="margin-top: 0; color: #000000;">Dobrodošli {first_name}</h2>
-                            <p style="color: #555555; line-height: 1.5;">Vaš korisnički račun je kreiran. Drago nam je što ste nam se pridružili.</p>
-                            
-                            <table width="100%" style="background-color: #f9f9f9; border-left: 4px solid #000000; margin: 20px 0; padding: 20px;">
-                                <tr>
-                                    <td>
-                                        <p style="margin: 0 0 5px 0; font-size: 12px; text-transform: uppercase; color: #888888;">E-mail</p>
-                                        <p style="margin: 0 0 15px 0; font-size: 16px; font-weight: bold; color: #000000;">{email}</p>
-                                        
-                                        <p style="margin: 0 0 5px 0; font-size: 12px; text-transform: uppercase; color: #888888;">Lozinka</p>
-                                        <p style="margin: 0; font-size: 16px; font-weight: bold; color: #000000;">{password}</p>
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <p style="color: #666666; font-size: 14px;">Svoju lozinku možete promijeniti u mobilnoj aplikaciji.</p>
-                            
-                            <p style="margin-top: 30px; font-weight: bold;">Lijep pozdrav,<br>Chosen International Tim</p>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="background-color: #f9f9f9; padding: 20px; text-align: center; font-size: 12px; color: #999999;">
-                            &copy; Chosen International. Sva prava pridržana.
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-"""
+    # Shared SES Client
+    ses = _ses
 
     # Send Logic
     try:
-        response = ses.send_email(
-            Source=settings.SES_FROM_EMAIL,
-            Destination={"ToAddresses": [email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    # SES sends Multipart: Clients that support HTML show HTML, others show Text.
-                    # Charset UTF-8 is crucial for Croatian characters (č, ć, ž, š, đ)
-                    "Text": {"Data": text_body, "Charset": "UTF-8"},
-                    "Html": {"Data": html_body, "Charset": "UTF-8"},
-                },
+        await _wait_for_send_slot()
+
+        if _SES_USE_TEMPLATES:
+            # Only the variables travel; SES renders the stored template
+            return await ses.send_templated_email(
+                Source=_SES_FROM_EMAIL,
+                Destination={"ToAddresses": [email]},
+                Template=WELCOME_TEMPLATE_NAME,
+                TemplateData=json.dumps({"first_name": first_name, "email": email, "password": password}),
+            )
+
+        # Multipart text + HTML (UTF-8 for č, ć, ž, š, đ), pre-built at import
+        to = _recipient_address(email)
+        response = await ses.send_raw_email(
+            Source=_SES_FROM_EMAIL,
+            Destinations=[to.addr_spec],
+            RawMessage={
+                "Data": _fill_raw_message(
+                    _RAW_WELCOME, to, first_name=first_name, email=email, password=password
+                )
             },
         )
         return response
@@ -126,126 +220,78 @@ def get_reset_token_expiry(hours: int = 24):
     return datetime.now(timezone.utc) + timedelta(hours=hours)
 
 
-def send_password_reset_email(first_name: str, email: str, reset_token: str, reset_url: str = None):
+async def send_password_reset_email(first_name: str, email: str, reset_token: str, reset_url: str = None):
     """
     Sends a password reset email using AWS SES with a clickable link.
     Includes both HTML and Plain Text versions.
     """
 
-    # Initialize SES Client
-    ses = boto3.client(
-        "ses",
-        region_name=settings.AWS_SES_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    # Shared SES Client
+    ses = _ses
 
     # Default reset URL if not provided
     if not reset_url:
         reset_url = f"https://admin.chosen-international.com/reset-password?token={reset_token}"
 
-    subject = "Chosen International - Zahtjev za resetiranje lozinke"
-
-    # Plain Text Version
-    text_body = f"""
-Pozdrav {first_name},
-
-Primili smo zahtjev za resetiranje Vaše lozinke.
-
-Kliknite na sljedeći link za resetiranje lozinke:
-{reset_url}
-
-Ako link ne radi, kopirajte ga i zalijepite u svoj preglednik.
-
-Ovaj link vrijedi 24 sata.
-
-Ako niste zatražili resetiranje lozinke, molimo ignorirajte ovaj e-mail.
-
-Lijep pozdrav,
-Chosen International Tim
-"""
-
-    # HTML Version with clickable button
-    html_body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<style>
-    body, td {{ font-family: 'Avenir', 'Segoe UI', 'Roboto', Helvetica, Arial, sans-serif; }}
-</style>
-</head>
-<body style="background-color: #f4f4f4; margin: 0; padding: 20px;">
-    <table border="0" cellpadding="0" cellspacing="0" width="100%">
-        <tr>
-            <td align="center">
-                <table border="0" cellpadding="0" cellspacing="0" width="600" style="background-color: #ffffff; max-width: 600px; width: 100%; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                    <tr>
-                        <td align="center" style="background-color: #000000; padding: 30px 20px;">
-                            <h1 style="color: #ffffff; margin: 0; font-size: 24px; letter-spacing: 2px; text-transform: uppercase; font-weight: 500;">
-                                CHOSEN INTERNATIONAL
-                            </h1>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 40px;">
-                            <h2 style="margin-top: 0; color: #000000;">Resetiranje lozinke</h2>
-                            <p style="color: #555555; line-height: 1.5;">Pozdrav {first_name},</p>
-                            <p style="color: #555555; line-height: 1.5;">Primili smo zahtjev za resetiranje Vaše lozinke.</p>
-
-                            <div style="text-align: center; margin: 30px 0;">
-                                <a href="{reset_url}"
-                                   style="display: inline-block;
-                                          padding: 16px 36px;
-                                          background-color: #000000;
-                                          color: #ffffff;
-                                          text-decoration: none;
-                                          border-radius: 8px;
-                                          font-weight: bold;
-                                          font-size: 16px;
-                                          letter-spacing: 1px;">
-                                    RESETIRAJ LOZINKU
-                                </a>
-                            </div>
-
-                            <p style="color: #666666; font-size: 14px; text-align: center; margin-top: 20px;">
-                                Ili kopirajte ovaj link u svoj preglednik:
-                            </p>
-                            <p style="color: #888888; font-size: 12px; word-break: break-all; background-color: #f9f9f9; padding: 12px; border-radius: 4px; text-align: center;">
-                                {reset_url}
-                            </p>
-
-                            <p style="color: #666666; font-size: 14px; margin-top: 30px;">Ovaj link vrijedi 24 sata.</p>
-                            <p style="color: #666666; font-size: 14px;">Ako niste zatražili resetiranje lozinke, molimo ignorirajte ovaj e-mail.</p>
-
-                            <p style="margin-top: 30px; font-weight: bold;">Lijep pozdrav,<br>Chosen International Tim</p>
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="background-color: #f9f9f9; padding: 20px; text-align: center; font-size: 12px; color: #999999;">
-                            &copy; Chosen International. Sva prava pridržana.
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>
-"""
-
     try:
-        response = ses.send_email(
-            Source=settings.SES_FROM_EMAIL,
-            Destination={"ToAddresses": [email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    "Text": {"Data": text_body, "Charset": "UTF-8"},
-                    "Html": {"Data": html_body, "Charset": "UTF-8"},
-                },
-            },
+        await _wait_for_send_slot()
+
+        if _SES_USE_TEMPLATES:
+            return await ses.send_templated_email(
+                Source=_SES_FROM_EMAIL,
+                Destination={"ToAddresses": [email]},
+                Template=RESET_TEMPLATE_NAME,
+                TemplateData=json.dumps({"first_name": first_name, "reset_url": reset_url}),
+            )
+
+        to = _recipient_address(email)
+        response = await ses.send_raw_email(
+            Source=_SES_FROM_EMAIL,
+            Destinations=[to.addr_spec],
+            RawMessage={"Data": _fill_raw_message(_RAW_RESET, to, first_name=first_name, reset_url=reset_url)},
         )
         return response
     except Exception as e:
         print(f"Error sending password reset email: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def sync_ses_templates():
+    """
+    Create or update the SES server-side templates from templates/*.j2.
+    Run once per deploy (before enabling SES_USE_TEMPLATES):
+        python -c "import asyncio; from functions.send_mail import sync_ses_templates; asyncio.run(sync_ses_templates())"
+    """
+    async with _new_ses_client() as ses:
+        for name, (subject, text_file, html_file) in SES_TEMPLATES.items():
+            template = {
+                "TemplateName": name,
+                "SubjectPart": subject,
+                "TextPart": _env.loader.get_source(_env, text_file)[0],
+                "HtmlPart": _env.loader.get_source(_env, html_file)[0],
+            }
+            try:
+                await ses.update_template(Template=template)
+            except ses.exceptions.TemplateDoesNotExistException:
+                await ses.create_template(Template=template)
+
+
+def _enqueue(coro) -> None:
+    """Schedule an email send on the app's event loop; safe to call from sync route threads."""
+    if _loop is None:
+        coro.close()
+        print("Error sending email: SES client is not open")
+        return
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+
+
+def queue_welcome_email(first_name: str, email: str, password: str) -> None:
+    """Queue a welcome email and return immediately."""
+    _enqueue(send_welcome_email(first_name, email, password))
+
+
+def queue_password_reset_email(first_name: str, email: str, reset_token: str, reset_url: str = None) -> None:
+    """Queue a password reset email and return immediately."""
+    _enqueue(send_password_reset_email(first_name, email, reset_token, reset_url))
@@ -1,20 +1,40 @@
 import os
 import uuid
 from pathlib import Path
+from typing import Literal
 from fastapi import HTTPException, UploadFile
 from PIL import Image
 from config import settings
-import magic
 
 UPLOAD_URL = Path(settings.UPLOAD_URL)
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP")  # Pillow decoders tried on upload
 MAX_IMAGE_SIZE = (1920, 1920)  # Max width/height in pixels
+MAGIC_SNIFF_BYTES = 4096  # Enough for libmagic to detect image formats
 
-def upload_profile_image(file: UploadFile) -> str:
+# Shared libmagic handle, the magic database is loaded once per process
+if settings.STRICT_MIME_CHECK:
+    import magic
+    _magic_mime = magic.Magic(mime=True)
+
+# Create upload directories once at import instead of on every request
+for _subdir in ("profile", "progress"):
+    (UPLOAD_URL / "uploads" / _subdir).mkdir(parents=True, exist_ok=True)
+
+
+def _spooled_size(file: UploadFile) -> int:
+    """Byte length of the received upload, found by seeking rather than reading"""
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def upload_image(file: UploadFile, subdir: Literal["profile", "progress"]) -> str:
     """
-    Securely upload and process profile image
+    Securely upload and process an image into uploads/<subdir>
     Returns: filename of uploaded image
     """
     
@@ -22,8 +42,8 @@ def upload_profile_image(file: UploadFile) -> str:
     if not file:
         raise HTTPException(status_code=400, detail="No file provided")
     
-    # 2. Check file size
-    if file.size > MAX_FILE_SIZE:
+    # 2. Check file size, measured on the spooled file rather than trusting the client
+    if _spooled_size(file) > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB")
     
     # 3. Validate file extension
@@ -35,42 +55,40 @@ def upload_profile_image(file: UploadFile) -> str:
         )
     
     try:
-        # 4. Read file content
-        file_content = file.file.read()
-        
-        # 5. Validate MIME type using python-magic
-        mime_type = magic.from_buffer(file_content, mime=True)
-        if mime_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file format. Detected: {mime_type}"
-            )
-        
-        # 6. Validate image using PIL
+        # 4. Optionally validate MIME type from the file head using python-magic
+        if settings.STRICT_MIME_CHECK:
+            head = file.file.read(MAGIC_SNIFF_BYTES)
+            file.file.seek(0)
+            mime_type = _magic_mime.from_buffer(head)
+            if mime_type not in ALLOWED_MIME_TYPES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file format. Detected: {mime_type}"
+                )
+        
+        # 5. Decode image once; any error raised while decoding comes from the client's
+        # bytes (plugins also raise ValueError/SyntaxError), so all of them map to 400
         try:
-            image = Image.open(file.file)
-            image.verify()  # Verify it's a valid image
-            file.file.seek(0)  # Reset file pointer
-            image = Image.open(file.file)
+            image = Image.open(file.file, formats=ALLOWED_FORMATS)
+            # JPEGs decode at a reduced DCT scale close to the target size
+            image.draft("RGB", MAX_IMAGE_SIZE)
+            image.load()
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid or corrupted image file")
         
-        # 7. Create secure filename
+        # 6. Create secure filename
         secure_filename = f"{uuid.uuid4().hex}{file_extension}"
         
-        # 8. Ensure upload directory exists
-        UPLOAD_URL.mkdir(parents=True, exist_ok=True)
-        
-        # 9. Resize image if too large
+        # 7. Resize image if too large
         if image.size[0] > MAX_IMAGE_SIZE[0] or image.size[1] > MAX_IMAGE_SIZE[1]:
-            image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+            image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.BILINEAR)
         
-        # 10. Convert to RGB if necessary (for JPEG compatibility)
+        # 8. Convert to RGB if necessary (for JPEG compatibility)
         if image.mode in ("RGBA", "P"):
             image = image.convert("RGB")
         
-        # 11. Save file
-        file_path = UPLOAD_URL / "uploads" / "profile" /  secure_filename
+        # 9. Save file
+        file_path = UPLOAD_URL / "uploads" / subdir / secure_filename
         image.save(file_path, format="JPEG", quality=85, optimize=True)
         
         return secure_filename
@@ -83,72 +101,9 @@ def upload_profile_image(file: UploadFile) -> str:
         file.file.close()
 
 
+def upload_profile_image(file: UploadFile) -> str:
+    return upload_image(file, "profile")
+
+
 def upload_progress(file: UploadFile) -> str:
-    """
-    Securely upload and process profile image
-    Returns: filename of uploaded image
-    """
-    
-    # 1. Validate file exists
-    if not file:
-        raise HTTPException(status_code=400, detail="No file provided")
-    
-    # 2. Check file size
-    if file.size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB")
-    
-    # 3. Validate file extension
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    try:
-        # 4. Read file content
-        file_content = file.file.read()
-        
-        # 5. Validate MIME type using python-magic
-        mime_type = magic.from_buffer(file_content, mime=True)
-        if mime_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file format. Detected: {mime_type}"
-            )
-        
-        # 6. Validate image using PIL
-        try:
-            image = Image.open(file.file)
-            image.verify()  # Verify it's a valid image
-            file.file.seek(0)  # Reset file pointer
-            image = Image.open(file.file)
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid or corrupted image file")
-        
-        # 7. Create secure filename
-        secure_filename = f"{uuid.uuid4().hex}{file_extension}"
-        
-        # 8. Ensure upload directory exists
-        UPLOAD_URL.mkdir(parents=True, exist_ok=True)
-        
-        # 9. Resize image if too large
-        if image.size[0] > MAX_IMAGE_SIZE[0] or image.size[1] > MAX_IMAGE_SIZE[1]:
-            image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
-        
-        # 10. Convert to RGB if necessary (for JPEG compatibility)
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        
-        # 11. Save file
-        file_path = UPLOAD_URL / "uploads" / "progress" /  secure_filename
-        image.save(file_path, format="JPEG", quality=85, optimize=True)
-        
-        return secure_filename
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process image: {str(e)}")
-    finally:
-        file.file.close()
\ No newline at end of file
+    return upload_image(file, "progress")
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from database import Base, engine
+from config import settings
 
 from routers.auth import auth_router
 from routers.user import user_router
@@ -19,25 +20,56 @@ from models.event import Event, EventCopy
 from models.questionnaire import UserQuestionnaire
 
 from functions.fcm import FCMService
+from functions.send_mail import open_ses_client, close_ses_client
 
-from starlette.responses import StreamingResponse, FileResponse
 import logging
 import logging.handlers
 import time
-import json
+import orjson
+import itertools
 import os
-from datetime import datetime
+import queue
+import re
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
 
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
 
 
 
-app = FastAPI(title="chosen-api", version="1.0.0")
-Base.metadata.create_all(bind=engine)
+# ✅ Application lifespan: shared clients are opened once and reused by every request
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()  # Anything logged during import is already queued and gets written now
+    logger.info("🚀 CHOSEN API Starting up...", extra={'color': True})
+    
+    # Local convenience only; deployed schemas come from import.sql + migrations/
+    if settings.AUTO_CREATE_TABLES:
+        Base.metadata.create_all(bind=engine)
+    
+    # Initialize Firebase Cloud Messaging
+    FCMService.initialize()
+    
+    # Shared async SES client (one HTTPS connection pool) for outgoing email
+    app.state.ses = await open_ses_client()
+    
+    logger.info("📁 Logs directory: %s", logs_dir.absolute(), extra={'color': True})
+    logger.info("✅ CHOSEN API Started successfully!", extra={'color': True})
+    
+    yield
+    
+    logger.info("🛑 CHOSEN API Shutting down...", extra={'color': True})
+    await close_ses_client()
+    logger.info("✅ CHOSEN API Stopped successfully!", extra={'color': True})
+    log_listener.stop()  # Flushes queued records to the log files
+
+
+app = FastAPI(title="chosen-api", version="1.0.0", lifespan=lifespan)
 
 origins = [
     "http://localhost",
@@ -66,6 +98,14 @@ app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 logs_dir = Path("logs")
 logs_dir.mkdir(exist_ok=True)
 
+# Current request id, attached to every log record by RequestIdFilter
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
 # ✅ Setup logging configuration inline
 def setup_logging():
     """Setup comprehensive logging"""
@@ -81,15 +121,17 @@ def setup_logging():
             'RESET': '\033[0m'      # Reset
         }
         
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Padded level names, plain and color-wrapped, built once
+            reset = self.COLORS['RESET']
+            self._plain_levels = {lvl: f"{lvl:<8}" for lvl in self.COLORS if lvl != 'RESET'}
+            self._color_levels = {lvl: f"{c}{lvl:<8}{reset}" for lvl, c in self.COLORS.items() if lvl != 'RESET'}
+        
         def format(self, record):
-            if hasattr(record, 'color') and record.color:
-                level_color = self.COLORS.get(record.levelname, '')
-                reset_color = self.COLORS['RESET']
-                original_levelname = record.levelname
-                record.levelname = f"{level_color}{record.levelname}{reset_color}"
-                formatted = super().format(record)
-                record.levelname = original_levelname
-                return formatted
+            # Set a separate attribute: the same record also goes to the file handlers
+            levels = self._color_levels if getattr(record, 'color', False) else self._plain_levels
+            record.levelname_color = levels.get(record.levelname, record.levelname)
             return super().format(record)
     
     # Create main logger
@@ -101,7 +143,7 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_formatter = ColoredFormatter(
-        fmt='%(asctime)s | %(levelname)-8s | %(message)s',
+        fmt='%(asctime)s | %(levelname_color)s | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(console_formatter)
@@ -115,7 +157,7 @@ def setup_logging():
     )
     file_handler.setLevel(logging.INFO)
     file_formatter = logging.Formatter(
-        fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+        fmt='%(asctime)s | %(levelname)-8s | %(request_id)s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(file_formatter)
@@ -130,33 +172,34 @@ def setup_logging():
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
     
-    # Add handlers
+    # Add handlers; file writes and rotation happen on the listener thread, off the request path
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, error_handler, respect_handler_level=True)
     logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    logger.addHandler(error_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.addFilter(RequestIdFilter())
     logger.propagate = False
     
-    return logger
+    return logger, listener
 
 # ✅ Initialize logger
-logger = setup_logging()
+logger, log_listener = setup_logging()
 
 # ✅ Helper functions
+# Any key containing one of these (case-insensitive) is masked; "token" also covers access_token
+_SENSITIVE_KEY_RE = re.compile(r"password|token|secret|authorization", re.IGNORECASE)
+
 def mask_sensitive_data(data):
     """Mask sensitive fields in log data"""
     if not isinstance(data, dict):
         return data
     
-    sensitive_fields = {'password', 'token', 'secret', 'authorization', 'access_token'}
-    masked_data = data.copy()
-    
-    for key, value in masked_data.items():
-        if any(sensitive in key.lower() for sensitive in sensitive_fields):
-            masked_data[key] = "***MASKED***"
-        elif isinstance(value, dict):
-            masked_data[key] = mask_sensitive_data(value)
-    
-    return masked_data
+    return {
+        key: "***MASKED***" if _SENSITIVE_KEY_RE.search(str(key))
+        else mask_sensitive_data(value) if isinstance(value, dict)
+        else value
+        for key, value in data.items()
+    }
 
 def format_json_for_log(data, max_length=1000):
     """Format data as JSON for logging"""
@@ -164,7 +207,7 @@ def format_json_for_log(data, max_length=1000):
         if isinstance(data, dict):
             data = mask_sensitive_data(data)
         
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
+        json_str = orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
         
         if len(json_str) > max_length:
             return json_str[:max_length] + "... [truncated]"
@@ -174,165 +217,134 @@ def format_json_for_log(data, max_length=1000):
         return str(data)
 
 
-def _safe_content_length(resp) -> str:
-    try:
-        # Prefer explicit header if present
-        cl = resp.headers.get("content-length")
-        if cl is not None:
-            return cl  # header values are strings
-        # If it's a streaming/file response, length is typically unknown
-        if isinstance(resp, (StreamingResponse, FileResponse)):
-            return "streaming"
-    except Exception:
-        pass
-    return "unknown"
-
-SAFE_BODY_LOG_BYTES = 64_000  # 64KB cap to avoid huge logs
-TEXT_TYPES_PREFIXES = (
-    "application/json",
-    "application/x-www-form-urlencoded",
-    "text/",
-)
-
-def _is_textual(content_type: Optional[str]) -> bool:
-    if not content_type:
-        return False
-    ct = content_type.split(";")[0].strip().lower()
-    return ct.startswith(TEXT_TYPES_PREFIXES)
-
-def _is_multipart(content_type: Optional[str]) -> bool:
-    return bool(content_type and content_type.lower().startswith("multipart/form-data"))
-
-# ✅ Enhanced middleware - FIXED for file uploads
-@app.middleware("http")
-async def comprehensive_logging_middleware(request: Request, call_next):
-    # Generate request id & timing
-    request_id = f"req_{int(time.time() * 1000)}"
-    start_time = time.time()
+BODY_DEBUG_LOG_BYTES = 4096  # Only small JSON bodies are ever logged, and only at DEBUG
+ERROR_BODY_LOG_BYTES = 1000  # Error responses up to this size are logged, also only at DEBUG
 
-    client_ip = request.client.host if request.client else "unknown"
-    logger.info(f"🔵 [{request_id}] {request.method} {request.url.path} | Client: {client_ip}", extra={"color": True})
+def _raw_header(raw_headers, name: bytes) -> bytes:
+    """First value of a header from an ASGI header list, b"" if missing"""
+    for key, value in raw_headers:
+        if key == name:
+            return value
+    return b""
 
-    if request.query_params:
-        logger.info(f"🔍 [{request_id}] Query: {dict(request.query_params)}", extra={"color": True})
-
-    # ----- Request body logging (safe) -----
-    content_type = request.headers.get("content-type", "")
-    content_length_hdr = request.headers.get("content-length")
+def _log_json_body(raw: bytes, request_id: str):
     try:
-        content_length = int(content_length_hdr) if content_length_hdr else None
-    except ValueError:
-        content_length = None
-
-    # CRITICAL FIX: Don't read request body for multipart requests
-    if _is_multipart(content_type):
-        # Don't try to read file bytes - this breaks file uploads
-        logger.info(f"📄 [{request_id}] Body: <multipart/form-data with files: {content_length or 'unknown'} bytes>", extra={"color": True})
-    elif _is_textual(content_type):
+        logger.debug("📄 [%s] Body (JSON):\n%s", request_id, format_json_for_log(orjson.loads(raw)), extra={"color": True})
+    except Exception as e:
+        # Never fail the request because of logging
+        logger.debug("📄 [%s] Body not logged: %s", request_id, e, extra={"color": True})
+
+# Request ids: per-process random prefix + counter, unique across workers without a syscall per request
+_REQUEST_ID_PREFIX = os.urandom(2).hex()
+_request_counter = itertools.count(1)
+
+# Probes, docs and static files pass straight through without logging
+_UNLOGGED_PATHS = frozenset({"/", "/health", "/docs", "/redoc", "/openapi.json"})
+_UNLOGGED_PREFIXES = ("/uploads/", "/docs/")
+
+# ✅ Request logging middleware - pure ASGI, wraps receive/send instead of buffering the request
+class LoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _UNLOGGED_PATHS or scope["path"].startswith(_UNLOGGED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Generate request id & timing
+        request_id = f"req_{_REQUEST_ID_PREFIX}{next(_request_counter):06x}"
+        request_id_var.set(request_id)
+        start_time = time.perf_counter()
+        method, path = scope["method"], scope["path"]
+        raw_headers = scope["headers"]  # ASGI guarantees lowercase header names
+        log_bodies = logger.isEnabledFor(logging.DEBUG)
+
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        logger.info("🔵 [%s] %s %s | Client: %s", request_id, method, path, client_ip, extra={"color": True})
+
+        # Raw, still URL-encoded query string; no parsing just to log it
+        if scope.get("query_string"):
+            logger.info("🔍 [%s] Query: %s", request_id, scope["query_string"].decode("latin-1"), extra={"color": True})
+
+        # Tee small JSON bodies into the debug log as they are received; messages pass
+        # through unchanged and at most BODY_DEBUG_LOG_BYTES are ever held for the preview
+        content_type = _raw_header(raw_headers, b"content-type") if log_bodies else b""
+        if content_type.lower().startswith(b"application/json"):
+            try:
+                content_length = int(_raw_header(raw_headers, b"content-length") or 0)
+            except ValueError:
+                content_length = 0
+            if content_length < BODY_DEBUG_LOG_BYTES:
+                preview = bytearray()
+                downstream_receive = receive
+
+                async def receive():
+                    nonlocal preview
+                    message = await downstream_receive()
+                    if message["type"] == "http.request" and preview is not None:
+                        preview += message.get("body", b"")[:BODY_DEBUG_LOG_BYTES + 1 - len(preview)]
+                        if len(preview) > BODY_DEBUG_LOG_BYTES:
+                            # Stop collecting; the rest of the stream just passes through
+                            logger.debug("📄 [%s] Body: <over %d bytes, not logged>", request_id, BODY_DEBUG_LOG_BYTES, extra={"color": True})
+                            preview = None
+                        elif not message.get("more_body", False) and preview:
+                            _log_json_body(bytes(preview), request_id)
+                    return message
+
+        # Masked auth header
+        if _raw_header(raw_headers, b"authorization"):
+            logger.info("🔑 [%s] Auth: Bearer ***", request_id, extra={"color": True})
+
+        status_code = 500
+        content_length_resp = "unknown"
+        error_body = []
+
+        async def send_wrapper(message):
+            nonlocal status_code, content_length_resp
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # No content-length means a streamed/chunked response
+                content_length_resp = _raw_header(message["headers"], b"content-length").decode("latin-1") or "streaming"
+            elif log_bodies and message["type"] == "http.response.body" and status_code >= 400:
+                if sum(map(len, error_body)) <= ERROR_BODY_LOG_BYTES:
+                    error_body.append(message.get("body", b""))
+            await send(message)
+
+        # ----- Call downstream -----
         try:
-            # Only read if not too large
-            if content_length and content_length > SAFE_BODY_LOG_BYTES:
-                logger.info(
-                    f"📄 [{request_id}] Body: <{content_type} {content_length} bytes: skipped (too large)>",
-                    extra={"color": True},
-                )
-            else:
-                # SAFE: Only read body for non-multipart requests
-                raw = await request.body()  # Starlette caches this, downstream can still read
-                if len(raw) > SAFE_BODY_LOG_BYTES:
-                    raw = raw[:SAFE_BODY_LOG_BYTES]
-                    truncated = True
-                else:
-                    truncated = False
-
-                # Try JSON pretty print first
-                if content_type.lower().startswith("application/json"):
-                    try:
-                        parsed = json.loads(raw.decode("utf-8"))
-                        parsed = mask_sensitive_data(parsed)  # Mask sensitive data
-                        formatted = json.dumps(parsed, indent=2, ensure_ascii=False)
-                        if truncated:
-                            formatted += "\n... [truncated]"
-                        logger.info(f"📄 [{request_id}] Body (JSON):\n{formatted}", extra={"color": True})
-                    except Exception:
-                        # Fallback to plain text
-                        text = raw.decode("utf-8", errors="replace")
-                        if truncated:
-                            text += "... [truncated]"
-                        logger.info(f"📄 [{request_id}] Body (text): {text}", extra={"color": True})
-                else:
-                    # urlencoded / text/*
-                    text = raw.decode("utf-8", errors="replace")
-                    if truncated:
-                        text += "... [truncated]"
-                    logger.info(f"📄 [{request_id}] Body (text): {text}", extra={"color": True})
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Never fail the request because of logging
-            logger.error(f"❌ [{request_id}] Error reading request body: {e}", extra={"color": True})
-    else:
-        # Unknown/binary type
-        if content_length is not None:
-            logger.info(
-                f"📄 [{request_id}] Body: <{content_type or 'unknown type'} {content_length} bytes: not logged>",
+            process_time = time.perf_counter() - start_time
+            logger.error(
+                "💥 [%s] EXCEPTION: %s %s | Error: %s | Time: %.3fs",
+                request_id, method, path, e, process_time,
+                exc_info=True,
                 extra={"color": True},
             )
-        else:
-            logger.info(
-                f"📄 [{request_id}] Body: <{content_type or 'unknown type'}: not logged>",
-                extra={"color": True},
-            )
-
-    # Masked auth header
-    if request.headers.get("authorization"):
-        logger.info(f"🔑 [{request_id}] Auth: Bearer ***", extra={"color": True})
+            raise
 
-    # ----- Call downstream -----
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
 
         # Status emoji
-        emoji = "✅" if response.status_code < 300 else "🔄" if response.status_code < 400 else "⚠️" if response.status_code < 500 else "❌"
-
-        content_length_resp = response.headers.get("content-length", "unknown")
-        content_length_resp = _safe_content_length(response)
-        try:
-            logger.info(
-                f"{emoji} [{request_id}] {response.status_code} | "
-                f"{process_time:.3f}s | {content_length_resp} bytes",
-                extra={"color": True},
-            )
-        except Exception as log_err:
-            # Never let logging crash the request
-            logger.error(f"Response logging failed: {log_err}", extra={"color": True})
+        emoji = "✅" if status_code < 300 else "🔄" if status_code < 400 else "⚠️" if status_code < 500 else "❌"
+        logger.info(
+            "%s [%s] %d | %.3fs | %s bytes",
+            emoji, request_id, status_code, process_time, content_length_resp,
+            extra={"color": True},
+        )
 
         if process_time > 1.0:
-            logger.warning(f"🐌 [{request_id}] SLOW REQUEST: {process_time:.3f}s for {request.method} {request.url.path}", extra={"color": True})
+            logger.warning("🐌 [%s] SLOW REQUEST: %.3fs for %s %s", request_id, process_time, method, path, extra={"color": True})
 
-        # Log error response bodies for debugging
-        if response.status_code >= 400:
-            try:
-                # Only log error responses that are small and text-based
-                body_bytes = getattr(response, "body", None)
-                if body_bytes is not None and len(body_bytes) < 1000:
-                    try:
-                        text = body_bytes.decode("utf-8", errors="replace")
-                        logger.info(f"📄 [{request_id}] Error Response: {text}", extra={"color": True})
-                    except Exception:
-                        logger.info(f"📄 [{request_id}] Error Response: <{len(body_bytes)} bytes, not text>", extra={"color": True})
-            except Exception:
-                pass
-
-        return response
+        # Log small error response bodies for debugging
+        body_bytes = b"".join(error_body)
+        if body_bytes and len(body_bytes) < ERROR_BODY_LOG_BYTES:
+            logger.debug("📄 [%s] Error Response: %s", request_id, body_bytes.decode("utf-8", errors="replace"), extra={"color": True})
 
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"💥 [{request_id}] EXCEPTION: {request.method} {request.url.path} | Error: {str(e)} | Time: {process_time:.3f}s",
-            exc_info=True,
-            extra={"color": True},
-        )
-        raise
+app.add_middleware(LoggingMiddleware)
+# Registered last so it wraps the logger, which then sees uncompressed sizes
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # ✅ Exception handlers
 @app.exception_handler(RequestValidationError)
@@ -340,10 +352,10 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     error_details = exc.errors()
     
     logger.error(
-        f"🔴 VALIDATION ERROR: {request.method} {request.url.path}",
+        "🔴 VALIDATION ERROR: %s %s", request.method, request.url.path,
         extra={'color': True}
     )
-    logger.error(f"🔴 Details: {format_json_for_log(error_details)}")
+    logger.error("🔴 Details: %s", format_json_for_log(error_details))
     
     return JSONResponse(
         status_code=422,
@@ -356,7 +368,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(
-        f"💥 UNHANDLED EXCEPTION: {request.method} {request.url.path} - {str(exc)}",
+        "💥 UNHANDLED EXCEPTION: %s %s - %s", request.method, request.url.path, exc,
         exc_info=True,
         extra={'color': True}
     )
@@ -369,22 +381,6 @@ async def general_exception_handler(request: Request, exc: Exception):
         }
     )
 
-# ✅ Application lifecycle events
-@app.on_event("startup")
-async def startup_event():
-    logger.info("🚀 CHOSEN API Starting up...", extra={'color': True})
-    
-    # Initialize Firebase Cloud Messaging
-    FCMService.initialize()
-    
-    logger.info(f"📁 Logs directory: {logs_dir.absolute()}", extra={'color': True})
-    logger.info("✅ CHOSEN API Started successfully!", extra={'color': True})
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("🛑 CHOSEN API Shutting down...", extra={'color': True})
-    logger.info("✅ CHOSEN API Stopped successfully!", extra={'color': True})
-
 # ✅ Include routers
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -399,10 +395,9 @@ app.include_router(notification_router)
 # ✅ Health check endpoint
 @app.get("/health")
 async def health_check():
-    logger.info("💓 Health check requested", extra={'color': True})
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         "message": "CHOSEN API is running",
         "version": "1.0.0"
     }
@@ -0,0 +1,8 @@
+-- Add indexes for chat thread and message lookups
+
+-- Thread history / last message: WHERE thread_id = ? ORDER BY created_at
+CREATE INDEX idx_chat_messages_thread_created ON chat_messages(thread_id, created_at);
+
+-- Thread lists per participant, filtered on soft delete
+CREATE INDEX idx_chat_threads_client_deleted ON chat_threads(client_id, deleted_at);
+CREATE INDEX idx_chat_threads_trainer_deleted ON chat_threads(trainer_id, deleted_at);
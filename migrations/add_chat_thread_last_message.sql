@@ -0,0 +1,19 @@
+-- Denormalize the newest message onto chat_threads so thread lists skip a per-thread message query
+
+ALTER TABLE chat_threads
+ADD COLUMN last_preview VARCHAR(200) NULL,
+ADD COLUMN last_sender_id INT NULL,
+ADD COLUMN last_message_at DATETIME NULL,
+ADD CONSTRAINT fk_chat_threads_last_sender FOREIGN KEY (last_sender_id) REFERENCES users(id);
+
+-- Backfill from the latest message of each thread
+UPDATE chat_threads t
+JOIN chat_messages m ON m.id = (
+    SELECT m2.id FROM chat_messages m2
+    WHERE m2.thread_id = t.id
+    ORDER BY m2.created_at DESC, m2.id DESC
+    LIMIT 1
+)
+SET t.last_preview = LEFT(m.body, 200),
+    t.last_sender_id = m.user_id,
+    t.last_message_at = m.created_at;
@@ -0,0 +1,4 @@
+-- Add index for unread-message lookups (unread counts, auto mark-as-read)
+
+-- WHERE thread_id = ? AND read_at IS NULL AND user_id (=|!=) ?; covering for COUNT(*)
+CREATE INDEX idx_chat_messages_thread_unread ON chat_messages(thread_id, read_at, user_id);
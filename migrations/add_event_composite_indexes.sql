@@ -0,0 +1,12 @@
+-- Replace single-column event indexes with composites matching the calendar queries
+-- The composites lead with the foreign key column, so they also back the FK constraints
+
+CREATE INDEX idx_events_user_time ON events(user_id, start_time, end_time);
+DROP INDEX ix_events_user_id ON events;
+DROP INDEX ix_events_start_time ON events;
+
+CREATE INDEX idx_event_copies_user_date ON event_copies(user_id, date);
+DROP INDEX ix_event_copies_user_id ON event_copies;
+
+CREATE INDEX idx_event_exceptions_event_date ON event_exceptions(event_id, exception_date);
+DROP INDEX ix_event_exceptions_event_id ON event_exceptions;
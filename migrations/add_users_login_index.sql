@@ -0,0 +1,3 @@
+-- Covering index for /auth/login (email + deleted_at lookup returning id, role_id, password_hash)
+-- InnoDB secondary indexes carry the primary key, so id needs no explicit column
+CREATE INDEX idx_users_login ON users(email, deleted_at, role_id, password_hash);
@@ -0,0 +1,159 @@
+-- Drop the redundant secondary indexes on primary key columns
+-- (created by index=True on the id columns; the PRIMARY KEY already indexes id)
+--
+-- Targets both schema paths: databases built by Base.metadata.create_all carry
+-- an ix_<table>_id index on every table, while databases built from import.sql
+-- only have them on the tables create_all added later (events, event_copies,
+-- event_exceptions, motivational_quotes). MySQL has no DROP INDEX IF EXISTS, so
+-- each drop is guarded by an information_schema.statistics lookup and is a
+-- no-op when the index is absent; the script is safe to re-run.
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'chat_messages' AND index_name = 'ix_chat_messages_id') > 0,
+    'DROP INDEX ix_chat_messages_id ON chat_messages',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'chat_threads' AND index_name = 'ix_chat_threads_id') > 0,
+    'DROP INDEX ix_chat_threads_id ON chat_threads',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'day_rating' AND index_name = 'ix_day_rating_id') > 0,
+    'DROP INDEX ix_day_rating_id ON day_rating',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'event_copies' AND index_name = 'ix_event_copies_id') > 0,
+    'DROP INDEX ix_event_copies_id ON event_copies',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'event_exceptions' AND index_name = 'ix_event_exceptions_id') > 0,
+    'DROP INDEX ix_event_exceptions_id ON event_exceptions',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'events' AND index_name = 'ix_events_id') > 0,
+    'DROP INDEX ix_events_id ON events',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'motivational_quotes' AND index_name = 'ix_motivational_quotes_id') > 0,
+    'DROP INDEX ix_motivational_quotes_id ON motivational_quotes',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'progress_photos' AND index_name = 'ix_progress_photos_id') > 0,
+    'DROP INDEX ix_progress_photos_id ON progress_photos',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'reminder_settings' AND index_name = 'ix_reminder_settings_id') > 0,
+    'DROP INDEX ix_reminder_settings_id ON reminder_settings',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'roles' AND index_name = 'ix_roles_id') > 0,
+    'DROP INDEX ix_roles_id ON roles',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'user_questionnaire' AND index_name = 'ix_user_questionnaire_id') > 0,
+    'DROP INDEX ix_user_questionnaire_id ON user_questionnaire',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'users' AND index_name = 'ix_users_id') > 0,
+    'DROP INDEX ix_users_id ON users',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'water_goal' AND index_name = 'ix_water_goal_id') > 0,
+    'DROP INDEX ix_water_goal_id ON water_goal',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'water_tracking' AND index_name = 'ix_water_tracking_id') > 0,
+    'DROP INDEX ix_water_tracking_id ON water_tracking',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @stmt = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'weight_tracking' AND index_name = 'ix_weight_tracking_id') > 0,
+    'DROP INDEX ix_weight_tracking_id ON weight_tracking',
+    'DO 0'
+);
+PREPARE stmt FROM @stmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,21 @@
+-- Convert native ENUM columns to VARCHAR(16) + CHECK constraints (matches the models)
+-- Requires MySQL 8.0.16+ for enforced CHECK constraints.
+-- Stored values are unchanged: the ENUM labels become the VARCHAR contents.
+
+ALTER TABLE events
+MODIFY repeat_type VARCHAR(16) NOT NULL,
+MODIFY repeat_end_type VARCHAR(16) NOT NULL,
+ADD CONSTRAINT ck_events_repeat_type
+    CHECK (repeat_type IN ('none', 'daily', 'weekly', 'monthly', 'yearly', 'custom')),
+ADD CONSTRAINT ck_events_repeat_end_type
+    CHECK (repeat_end_type IN ('never', 'date', 'count'));
+
+ALTER TABLE event_exceptions
+MODIFY exception_type VARCHAR(16) NOT NULL,
+ADD CONSTRAINT ck_event_exceptions_exception_type
+    CHECK (exception_type IN ('deleted', 'modified'));
+
+ALTER TABLE progress_photos
+MODIFY angle VARCHAR(16) NOT NULL,
+ADD CONSTRAINT ck_progress_photos_angle
+    CHECK (angle IN ('front', 'side', 'back'));
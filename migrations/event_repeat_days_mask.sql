@@ -0,0 +1,17 @@
+-- Replace the CSV events.repeat_days ("0,2,4", 0 = Monday) with a weekday bitmask
+-- bit 0 = Monday ... bit 6 = Sunday
+
+ALTER TABLE events ADD COLUMN repeat_days_mask SMALLINT NOT NULL DEFAULT 0 AFTER repeat_interval;
+
+UPDATE events
+SET repeat_days_mask =
+      (FIND_IN_SET('0', REPLACE(repeat_days, ' ', '')) > 0)
+    | (FIND_IN_SET('1', REPLACE(repeat_days, ' ', '')) > 0) << 1
+    | (FIND_IN_SET('2', REPLACE(repeat_days, ' ', '')) > 0) << 2
+    | (FIND_IN_SET('3', REPLACE(repeat_days, ' ', '')) > 0) << 3
+    | (FIND_IN_SET('4', REPLACE(repeat_days, ' ', '')) > 0) << 4
+    | (FIND_IN_SET('5', REPLACE(repeat_days, ' ', '')) > 0) << 5
+    | (FIND_IN_SET('6', REPLACE(repeat_days, ' ', '')) > 0) << 6
+WHERE repeat_days IS NOT NULL AND repeat_days <> '';
+
+ALTER TABLE events DROP COLUMN repeat_days;
@@ -0,0 +1,17 @@
+-- Collapse the four reminder_settings SmallInteger flags into one bitmask
+-- bit 0 = water, bit 1 = scale, bit 2 = photo, bit 3 = plan_day
+
+ALTER TABLE reminder_settings ADD COLUMN reminders_enabled SMALLINT NOT NULL DEFAULT 15 AFTER user_id;
+
+UPDATE reminder_settings
+SET reminders_enabled =
+      (water_reminder <> 0)
+    | (scale_reminder <> 0) << 1
+    | (photo_reminder <> 0) << 2
+    | (plan_day_reminder <> 0) << 3;
+
+ALTER TABLE reminder_settings
+DROP COLUMN water_reminder,
+DROP COLUMN scale_reminder,
+DROP COLUMN photo_reminder,
+DROP COLUMN plan_day_reminder;
@@ -0,0 +1,31 @@
+-- Tighten VARCHAR lengths on columns whose values have a known maximum size
+--
+-- Run the guard queries first. Each must return 0 before its ALTER: in strict mode
+-- an over-long row makes the ALTER fail, in non-strict mode it is silently truncated.
+
+-- Guards
+SELECT COUNT(*) AS long_password_hashes FROM users WHERE CHAR_LENGTH(password_hash) > 128;
+SELECT COUNT(*) AS long_reset_tokens FROM users WHERE CHAR_LENGTH(reset_token) > 64;
+SELECT COUNT(*) AS long_image_urls FROM chat_messages WHERE CHAR_LENGTH(image_url) > 255;
+
+-- Cleanup: reset tokens are single-use and only valid for 24h, so an over-long
+-- (pre-token_urlsafe) token is just invalidated; the user can request a new link
+UPDATE users
+SET reset_token = NULL, reset_token_expires_at = NULL
+WHERE CHAR_LENGTH(reset_token) > 64;
+
+-- Cleanup: older chat rows may hold a full URL instead of the bare filename;
+-- keep only the part after the last '/' (the API prefixes /uploads/chat/<thread_id>/)
+UPDATE chat_messages
+SET image_url = SUBSTRING_INDEX(image_url, '/', -1)
+WHERE CHAR_LENGTH(image_url) > 255;
+
+-- argon2id hashes are ~97 chars, legacy bcrypt hashes 60
+ALTER TABLE users MODIFY password_hash VARCHAR(128) NOT NULL;
+
+-- secrets.token_urlsafe(32) produces 43 chars
+ALTER TABLE users MODIFY reset_token VARCHAR(64) NULL;
+
+-- Only the generated upload filename is stored; ChatMessageCreate/Update cap it at 255
+-- so longer input is rejected with a 422 instead of failing the INSERT
+ALTER TABLE chat_messages MODIFY image_url VARCHAR(255) NULL;
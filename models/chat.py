@@ -1,22 +1,32 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text, FetchedValue
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 from sqlalchemy.sql import func
 
 
 class ChatThread(Base):
     __tablename__ = "chat_threads"
+    __table_args__ = (
+        # Thread lookups always filter on a participant plus the soft-delete marker
+        Index("idx_chat_threads_client_deleted", "client_id", "deleted_at"),
+        Index("idx_chat_threads_trainer_deleted", "trainer_id", "deleted_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     trainer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
     deleted_at = Column(DateTime, nullable=True)
+    # Denormalized copy of the newest message, written in the same UPDATE that bumps
+    # updated_at on send so thread lists don't query chat_messages per thread
+    last_preview = Column(String(200), nullable=True)
+    last_sender_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    last_message_at = Column(DateTime, nullable=True)
 
     # Relationships
     messages = relationship("ChatMessage", back_populates="thread", cascade="all, delete-orphan")
@@ -24,18 +34,27 @@ class ChatThread(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Thread history and last-message queries: WHERE thread_id = ? ORDER BY created_at
+        Index("idx_chat_messages_thread_created", "thread_id", "created_at"),
+        # Unread lookups: WHERE thread_id = ? AND read_at IS NULL AND user_id (=|!=) ?
+        # (MySQL has no partial indexes; read_at IS NULL is still an index ref lookup)
+        Index("idx_chat_messages_thread_unread", "thread_id", "read_at", "user_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     thread_id = Column(Integer, ForeignKey("chat_threads.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    body = Column(Text, nullable=False)
-    image_url = Column(String(500), nullable=True)  # Store file URL here
+    # Message content is deferred (loaded together as the "content" group) so
+    # read-marker and count queries don't pull message bodies
+    body = deferred(Column(Text, nullable=False), group="content")
+    image_url = deferred(Column(String(255), nullable=True), group="content")  # Stored filename, not a full URL
     read_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
 
     # Relationships
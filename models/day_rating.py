@@ -1,17 +1,17 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, text, FetchedValue
 from sqlalchemy.sql import func
 from database import Base
 
 class DayRating(Base):
     __tablename__ = "day_rating"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     score = Column(Integer, nullable=True)
     note = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
\ No newline at end of file
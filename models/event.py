@@ -1,5 +1,5 @@
 # models/event.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, ForeignKey, SmallInteger, Date, Index, text, FetchedValue
 from sqlalchemy.orm import relationship
 from database import Base
 from sqlalchemy.sql import func
@@ -28,27 +28,34 @@ class ExceptionTypeEnum(enum.Enum):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Calendar queries: WHERE user_id = ? AND start_time/end_time range ORDER BY start_time
+        Index("idx_events_user_time", "user_id", "start_time", "end_time"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     parent_event_id = Column(Integer, ForeignKey("events.id", ondelete="SET NULL"), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    start_time = Column(DateTime, nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False, index=True)
     all_day = Column(Boolean, nullable=False, default=False)
-    repeat_type = Column(Enum(RepeatTypeEnum), nullable=False, default=RepeatTypeEnum.none)
+    # Enums are VARCHAR + CHECK (native_enum=False), not native ENUM types;
+    # constraint names match migrations/enum_varchar.sql
+    repeat_type = Column(Enum(RepeatTypeEnum, native_enum=False, create_constraint=True, length=16, name="ck_events_repeat_type"), nullable=False, default=RepeatTypeEnum.none)
     repeat_interval = Column(Integer, nullable=False, default=1)
-    repeat_days = Column(String(50), nullable=True)
+    # Weekly repeat days as a bitmask: bit 0 = Monday ... bit 6 = Sunday (datetime.weekday())
+    repeat_days_mask = Column(SmallInteger, nullable=False, default=0)
     repeat_until = Column(DateTime, nullable=True)
-    repeat_end_type = Column(Enum(RepeatEndTypeEnum), nullable=False, default=RepeatEndTypeEnum.never)
+    repeat_end_type = Column(Enum(RepeatEndTypeEnum, native_enum=False, create_constraint=True, length=16, name="ck_events_repeat_end_type"), nullable=False, default=RepeatEndTypeEnum.never)
     repeat_count = Column(Integer, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
 
     # Relationships - FIX: Specify foreign_keys explicitly
@@ -63,15 +70,35 @@ class Event(Base):
     )
     parent_event = relationship("Event", remote_side=[id], foreign_keys=[parent_event_id])
 
+    @property
+    def repeat_days(self):
+        """repeat_days_mask as the API's comma-separated weekday list ("0,2,4"), or None"""
+        mask = self.repeat_days_mask
+        if not mask:
+            return None
+        return ",".join(str(day) for day in range(7) if mask & (1 << day))
+
+    @repeat_days.setter
+    def repeat_days(self, value):
+        mask = 0
+        if value:
+            for day in value.split(","):
+                if day.strip():
+                    mask |= 1 << int(day)
+        self.repeat_days_mask = mask
+
 
 class EventCopy(Base):
     __tablename__ = "event_copies"
+    __table_args__ = (
+        Index("idx_event_copies_user_date", "user_id", "date"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     date = Column(DateTime, nullable=False, index=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     event = relationship("Event", back_populates="copies")
@@ -80,13 +107,16 @@ class EventCopy(Base):
 
 class EventException(Base):
     __tablename__ = "event_exceptions"
+    __table_args__ = (
+        Index("idx_event_exceptions_event_date", "event_id", "exception_date"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     exception_date = Column(Date, nullable=False, index=True)
-    exception_type = Column(Enum(ExceptionTypeEnum), nullable=False)
+    exception_type = Column(Enum(ExceptionTypeEnum, native_enum=False, create_constraint=True, length=16, name="ck_event_exceptions_exception_type"), nullable=False)
     modified_event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     event = relationship("Event", back_populates="exceptions", foreign_keys=[event_id])
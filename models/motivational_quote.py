@@ -3,7 +3,7 @@ File 1 of 3: models/motivational_quote.py
 Copy this entire file to your models folder
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, text, FetchedValue
 from sqlalchemy.sql import func
 from database import Base
 
@@ -11,17 +11,17 @@ from database import Base
 class MotivationalQuote(Base):
     __tablename__ = "motivational_quotes"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     quote = Column(Text, nullable=False)
     author = Column(String(255), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
     times_shown = Column(Integer, nullable=False, default=0)
     last_shown_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
     deleted_at = Column(DateTime, nullable=True)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, text, FetchedValue
 from sqlalchemy.sql import func
 from database import Base
 import enum
@@ -11,14 +11,14 @@ class PhotoAngleEnum(enum.Enum):
 class ProgressPhoto(Base):
     __tablename__ = "progress_photos"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    angle = Column(SQLEnum(PhotoAngleEnum), nullable=False)
+    angle = Column(SQLEnum(PhotoAngleEnum, native_enum=False, create_constraint=True, length=16, name="ck_progress_photos_angle"), nullable=False)
     image_url = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
     deleted_at = Column(DateTime, nullable=True)
\ No newline at end of file
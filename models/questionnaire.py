@@ -1,12 +1,12 @@
 # models/questionnaire.py
-from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Date, Time, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Date, Time, ForeignKey, JSON, text, FetchedValue
 from database import Base
 from sqlalchemy.sql import func
 
 class UserQuestionnaire(Base):
     __tablename__ = "user_questionnaire"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
     weight = Column(Float, nullable=True)
     height = Column(Float, nullable=True)
@@ -19,9 +19,9 @@ class UserQuestionnaire(Base):
     sleep_time = Column(Time, nullable=True)
     morning_routine = Column(Text, nullable=True)
     evening_routine = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
\ No newline at end of file
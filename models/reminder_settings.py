@@ -1,24 +1,53 @@
-from sqlalchemy import Column, Integer, SmallInteger, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, DateTime, ForeignKey, text, FetchedValue
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from database import Base
 from sqlalchemy.sql import func
 
 
+# Bits of ReminderSettings.reminders_enabled
+REMINDER_WATER = 1 << 0
+REMINDER_SCALE = 1 << 1
+REMINDER_PHOTO = 1 << 2
+REMINDER_PLAN_DAY = 1 << 3
+REMINDERS_ALL = REMINDER_WATER | REMINDER_SCALE | REMINDER_PHOTO | REMINDER_PLAN_DAY
+
+
+def _reminder_flag(flag: int) -> hybrid_property:
+    """Boolean view of one reminders_enabled bit, usable on instances and in queries"""
+
+    def fget(self):
+        mask = REMINDERS_ALL if self.reminders_enabled is None else self.reminders_enabled
+        return bool(mask & flag)
+
+    def fset(self, value):
+        mask = REMINDERS_ALL if self.reminders_enabled is None else self.reminders_enabled
+        self.reminders_enabled = (mask | flag) if value else (mask & ~flag)
+
+    def expr(cls):
+        return cls.reminders_enabled.op("&")(flag) != 0
+
+    return hybrid_property(fget, fset, expr=expr)
+
+
 class ReminderSettings(Base):
     __tablename__ = "reminder_settings"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
-    water_reminder = Column(SmallInteger, nullable=False, default=1)
-    scale_reminder = Column(SmallInteger, nullable=False, default=1)
-    photo_reminder = Column(SmallInteger, nullable=False, default=1)
-    plan_day_reminder = Column(SmallInteger, nullable=False, default=1)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    # One bit per reminder (REMINDER_* above) instead of a SmallInteger column each
+    reminders_enabled = Column(SmallInteger, nullable=False, default=REMINDERS_ALL)
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
 
+    water_reminder = _reminder_flag(REMINDER_WATER)
+    scale_reminder = _reminder_flag(REMINDER_SCALE)
+    photo_reminder = _reminder_flag(REMINDER_PHOTO)
+    plan_day_reminder = _reminder_flag(REMINDER_PLAN_DAY)
+
     # Relationships
-    user = relationship("User", foreign_keys=[user_id])
\ No newline at end of file
+    user = relationship("User", foreign_keys=[user_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, text, FetchedValue
 from sqlalchemy.orm import relationship
 from database import Base
 from sqlalchemy.sql import func
@@ -6,23 +6,28 @@ from sqlalchemy.sql import func
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Covering index for login: answers the email + deleted_at lookup and returns
+        # role_id/password_hash (and the PK, implicit in InnoDB) without a row fetch
+        Index("idx_users_login", "email", "deleted_at", "role_id", "password_hash"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False, default=2)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), nullable=False, unique=True, index=True)
-    password_hash = Column(String(255), nullable=False)
+    password_hash = Column(String(128), nullable=False)  # argon2id ~97 chars, legacy bcrypt 60
     profile_picture = Column(String(255), nullable=False)
-    reset_token = Column(String(255), nullable=True)
+    reset_token = Column(String(64), nullable=True)  # token_urlsafe(32) is 43 chars
     reset_token_expires_at = Column(DateTime, nullable=True)
     notification_preferences = Column(JSON, nullable=True)
     fcm_token = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=func.current_timestamp())
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(
         DateTime, 
-        default=func.current_timestamp(), 
-        onupdate=func.current_timestamp()
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        server_onupdate=FetchedValue()
     )
     deleted_at = Column(DateTime, nullable=True)
 
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, Request
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Request, BackgroundTasks
 from fastapi import HTTPException, status
+from sqlalchemy import insert, exists
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import SessionLocal
-from passlib.context import CryptContext
+from auth.password import pwd_context, hash_password, verify_and_update_password, DUMMY_PASSWORD_HASH
 from auth.jwt import create_access_token
 from auth.jwt import require_admin
 from auth.jwt import get_current_user
@@ -13,18 +16,17 @@ from typing import Optional
 from models.user_login import UserLogin
 from functions.upload import upload_profile_image
 from schema.notification import get_default_notification_preferences
-from functions.send_mail import send_welcome_email
+from functions.send_mail import queue_welcome_email
 import secrets
-import string
 from datetime import datetime, timezone
 
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def generate_random_password(length: int = 12) -> str:
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    # One urandom read; each URL-safe base64 char carries 6 bits, so `length` bytes
+    # is more than enough before trimming (12 chars = 72 bits)
+    return secrets.token_urlsafe(length)[:length]
 
 class RegisterRequest(BaseModel):
     first_name: str
@@ -47,16 +49,15 @@ def register(
     else:
         password = password.strip()
 
-    hashed_pw = pwd_context.hash(password)
-
-    # Check if user exists
-    existing_user = db.query(User).filter(User.email == email).first()
-    if existing_user:
+    # Check if user exists (EXISTS probe on the unique email index) before hashing
+    if db.query(exists().where(User.email == email)).scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with that email already exists."
         )
 
+    hashed_pw = pwd_context.hash(password)
+
     # Handle profile picture upload
     profile_picture_filename = None
     if profile_picture:
@@ -81,15 +82,20 @@ def register(
 
 
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent registration of the same email
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A user with that email already exists."
+        )
     db.refresh(new_user)
 
-    # Send email AFTER successful commit
-    try:
-        send_welcome_email(first_name, email, password)
-    except Exception as e:
-        # Email failed, but user is created — this is safest behavior
-        print("SES send error:", e)
+    # Queue email AFTER successful commit; the email worker sends it off the request path.
+    # send_welcome_email swallows SES errors, so a failed email never affects the created user.
+    queue_welcome_email(first_name, email, password)
 
     return {
         "message": f"User created by user {current_user['user_id']}",
@@ -108,24 +114,46 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+def _record_login(user_id: int, ip: Optional[str], ua: Optional[str]):
+    """Insert a user_logins audit row in its own short-lived session"""
+    with SessionLocal() as session:
+        session.execute(
+            insert(UserLogin).values(user_id=user_id, ip_address=ip, user_agent=ua[:255] if ua else None)
+        )
+        session.commit()
+
+def _find_login_user(db: Session, email: str):
+    # Only the columns in idx_users_login, so MySQL answers from the index alone
+    return db.query(User.id, User.role_id, User.password_hash).filter(
+        User.email == email, User.deleted_at == None
+    ).first()
+
+def _store_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(User).filter(User.id == user_id).update(
+        {"password_hash": password_hash}, synchronize_session=False
+    )
+    db.commit()
+
 @auth_router.post("/login")
-def login(data: LoginRequest, request: Request, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # async so hashing can wait on the hashing pool; the blocking DB calls go to the threadpool
     email= data.email
     password = data.password
-    user = db.query(User).filter(User.email == email, User.deleted_at == None).first()
-    if not user or not pwd_context.verify(password, user.password_hash):
+    user = await run_in_threadpool(_find_login_user, db, email)
+    # Always pay for one verify, even for unknown emails, so timing isn't an enumeration oracle
+    verified, upgraded_hash = await verify_and_update_password(
+        password, user.password_hash if user else DUMMY_PASSWORD_HASH
+    )
+    if not user or not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if upgraded_hash:
+        # One-time migration of a legacy bcrypt hash to argon2
+        await run_in_threadpool(_store_password_hash, db, user.id, upgraded_hash)
     
+    # Audit row is written after the response is sent
     ip = request.client.host if request.client else None
     ua = request.headers.get("user-agent")
-    login_record = UserLogin(
-        user_id=user.id,
-        ip_address=ip,
-        user_agent=ua
-    )
-    db.add(login_record)
-    db.commit()
-    db.refresh(login_record)
+    background_tasks.add_task(_record_login, user.id, ip, ua)
 
     access_token = create_access_token(data={"user_id": user.id, "role_id": user.role_id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -145,7 +173,7 @@ class ResetPasswordConfirm(BaseModel):
 
 
 @auth_router.post('/reset-password')
-def reset_password(
+async def reset_password(
     data: ResetPasswordConfirm,
     db: Session = Depends(get_db)
 ):
@@ -154,10 +182,12 @@ def reset_password(
     This is a public endpoint that anyone can use with a valid token.
     """
     # Find user by reset token
-    user = db.query(User).filter(
-        User.reset_token == data.token,
-        User.deleted_at == None
-    ).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(
+            User.reset_token == data.token,
+            User.deleted_at == None
+        ).first()
+    )
 
     if not user:
         raise HTTPException(
@@ -180,10 +210,10 @@ def reset_password(
         )
 
     # Update password and clear reset token
-    user.password_hash = pwd_context.hash(data.new_password)
+    user.password_hash = await hash_password(data.new_password)
     user.reset_token = None
     user.reset_token_expires_at = None
-    db.commit()
+    await run_in_threadpool(db.commit)
 
     return {
         "message": "Lozinka je uspješno promijenjena. Možete se sada prijaviti.",
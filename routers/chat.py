@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Form
 from fastapi import UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import and_, exists, func
 from database import get_db
 from auth.jwt import get_current_user
 from models.user import User
 from models.chat import ChatMessage, ChatThread
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
 import os
+import threading
+from cachetools import TTLCache
 from pathlib import Path
 import uuid
 import shutil
@@ -28,8 +29,41 @@ logger = logging.getLogger("chosen_api")
 
 chat_router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Cache of /chat/unread-count results: user_id -> count. Clients poll this endpoint;
+# entries are dropped when this worker sees a message sent to or read by the user.
+# The cache is per worker, so a send or read handled by another worker is only
+# reflected once the entry ages out: the unread badge can be stale for up to the TTL.
+_UNREAD_CACHE_TTL = 10.0
+_unread_cache = TTLCache(maxsize=10000, ttl=_UNREAD_CACHE_TTL)
+_unread_cache_lock = threading.Lock()
+
+
+def _invalidate_unread(*user_ids: int):
+    with _unread_cache_lock:
+        for uid in user_ids:
+            _unread_cache.pop(uid, None)
+
 upload_dir = Path(settings.UPLOAD_URL) / "uploads" / "chat"
 
+
+def _save_upload(src, dest_path: Path, size: int):
+    """
+    Write an uploaded file to dest_path.
+    Uploads past the spool threshold already sit in a real temp file, so those are
+    copied in-kernel with sendfile; small in-memory uploads use a plain buffered copy.
+    """
+    with open(dest_path, "wb") as out:
+        # _rolled is how Starlette itself tells a spooled upload is on disk
+        if hasattr(os, "sendfile") and getattr(src, "_rolled", False):
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src, out, 1 << 16)
+
 # Pydantic models
 class MessageCreate(BaseModel):
     thread_id: int
@@ -104,11 +138,17 @@ def send_message(
         
         db.add(message)
         
-        # Update thread's updated_at
-        thread.updated_at = datetime.utcnow()
+        # Bump thread's updated_at and last-message fields from the database clock,
+        # same as the message's created_at; flushed as one UPDATE with the insert
+        thread.updated_at = func.now()
+        thread.last_preview = data.body[:200]
+        thread.last_sender_id = user_id
+        thread.last_message_at = func.now()
         
         db.commit()
-        db.refresh(message)
+        _invalidate_unread(thread.client_id, thread.trainer_id)
+        # Name the deferred content columns so the response needs no extra lazy load
+        db.refresh(message, ["id", "thread_id", "user_id", "body", "image_url", "read_at", "created_at", "updated_at"])
         
         # 🆕 Send FCM notification to recipient
         sender = db.query(User).filter(User.id == user_id).first()
@@ -152,29 +192,36 @@ def get_thread_messages(
     # Verify thread access and user validity
     thread, client, trainer = verify_thread_access(thread_id, user_id, user_role, db)
     
-    # Get messages with pagination
-    offset = (page - 1) * limit
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.thread_id == thread_id
-    ).order_by(ChatMessage.created_at.asc()).offset(offset).limit(limit).all()
-    
     # Auto-mark messages as read when user opens the chat
-    # Mark all messages from OTHER users as read
-    other_user_messages = db.query(ChatMessage).filter(
+    # Mark all messages from OTHER users as read in one UPDATE. Done before loading
+    # the page so the returned rows carry read_at and the commit doesn't expire them.
+    marked = db.query(ChatMessage).filter(
         and_(
             ChatMessage.thread_id == thread_id,
             ChatMessage.user_id != user_id,
             ChatMessage.read_at == None
         )
-    ).all()
+    ).update({"read_at": func.now()}, synchronize_session=False)
     
-    if other_user_messages:
-        for message in other_user_messages:
-            message.read_at = datetime.utcnow()
+    if marked:
         db.commit()
+        _invalidate_unread(user_id)
+    
+    # Get messages with pagination; COUNT(*) OVER () returns the thread total on
+    # every row, so the page and the pagination count come from one statement
+    offset = (page - 1) * limit
+    rows = db.query(ChatMessage, func.count().over().label("total")).options(undefer_group("content")).filter(
+        ChatMessage.thread_id == thread_id
+    ).order_by(ChatMessage.created_at.asc()).offset(offset).limit(limit).all()
+    messages = [message for message, _ in rows]
     
-    # Get total count for pagination info
-    total = db.query(ChatMessage).filter(ChatMessage.thread_id == thread_id).count()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Page past the end: no row to carry the total
+        total = db.query(ChatMessage).filter(ChatMessage.thread_id == thread_id).count()
+    else:
+        total = 0
     
     # Convert messages to dict and add full file URLs
     messages_with_urls = []
@@ -223,9 +270,10 @@ def mark_messages_read(
             ChatMessage.user_id != user_id,  # Only mark OTHER users' messages as read
             ChatMessage.read_at == None
         )
-    ).update({"read_at": datetime.utcnow()}, synchronize_session=False)
+    ).update({"read_at": func.now()}, synchronize_session=False)
     
     db.commit()
+    _invalidate_unread(user_id)
     
     return {"messages_marked_read": messages_updated}
 
@@ -306,11 +354,6 @@ def list_threads_enhanced(current_user=Depends(get_current_user), db: Session =
             User.deleted_at == None
         ).first()
         
-        # Get last message
-        last_message = db.query(ChatMessage).filter(
-            ChatMessage.thread_id == thread.id
-        ).order_by(ChatMessage.created_at.desc()).first()
-        
         # Count unread messages from trainer
         unread_count = db.query(ChatMessage).filter(
             and_(
@@ -326,8 +369,8 @@ def list_threads_enhanced(current_user=Depends(get_current_user), db: Session =
             "client_id": thread.client_id,
             "created_at": thread.created_at,
             "updated_at": thread.updated_at,
-            "last_message": last_message.body if last_message else None,
-            "last_message_at": last_message.created_at if last_message else None,
+            "last_message": thread.last_preview,
+            "last_message_at": thread.last_message_at,
             "trainer_name": f"{trainer.first_name} {trainer.last_name}",
             "trainer_avatar": trainer.profile_picture,
             "client_avatar": client.profile_picture if client else None,
@@ -336,9 +379,28 @@ def list_threads_enhanced(current_user=Depends(get_current_user), db: Session =
         }]
     
     elif user_role == 1:  # Admin/Trainer role
-        # Get threads where both trainer and client are not deleted
-        threads = db.query(ChatThread).join(
+        # Unread messages from the client, counted per thread in one grouped query
+        unread_subq = db.query(
+            ChatMessage.thread_id,
+            func.count(ChatMessage.id).label("unread_count")
+        ).join(
+            ChatThread, ChatThread.id == ChatMessage.thread_id
+        ).filter(
+            ChatThread.trainer_id == user_id,
+            ChatMessage.user_id == ChatThread.client_id,  # Messages from client
+            ChatMessage.read_at == None
+        ).group_by(ChatMessage.thread_id).subquery()
+        
+        # Threads with their client and unread count in a single round trip;
+        # last message fields are denormalized on the thread itself
+        rows = db.query(
+            ChatThread,
+            User,
+            func.coalesce(unread_subq.c.unread_count, 0)
+        ).join(
             User, User.id == ChatThread.client_id
+        ).outerjoin(
+            unread_subq, unread_subq.c.thread_id == ChatThread.id
         ).filter(
             ChatThread.trainer_id == user_id,
             ChatThread.deleted_at == None,
@@ -351,41 +413,16 @@ def list_threads_enhanced(current_user=Depends(get_current_user), db: Session =
             User.deleted_at == None
         ).first()
         
-        # Enhance each thread with last message info
         enhanced_threads = []
-        for thread in threads:
-            # Get last message
-            last_message = db.query(ChatMessage).filter(
-                ChatMessage.thread_id == thread.id
-            ).order_by(ChatMessage.created_at.desc()).first()
-            
-            # Get client info (already verified not deleted in query)
-            client = db.query(User).filter(
-                User.id == thread.client_id,
-                User.deleted_at == None
-            ).first()
-            
-            # Skip if client was deleted (additional safety check)
-            if not client:
-                continue
-            
-            # Count unread messages from client
-            unread_count = db.query(ChatMessage).filter(
-                and_(
-                    ChatMessage.thread_id == thread.id,
-                    ChatMessage.user_id == thread.client_id,  # Messages from client
-                    ChatMessage.read_at == None
-                )
-            ).count()
-            
+        for thread, client, unread_count in rows:
             thread_dict = {
                 "id": thread.id,
                 "trainer_id": thread.trainer_id,
                 "client_id": thread.client_id,
                 "created_at": thread.created_at,
                 "updated_at": thread.updated_at,
-                "last_message": last_message.body if last_message else None,
-                "last_message_at": last_message.created_at if last_message else None,
+                "last_message": thread.last_preview,
+                "last_message_at": thread.last_message_at,
                 "client_name": f"{client.first_name} {client.last_name}",
                 "client_avatar": client.profile_picture,
                 "trainer_avatar": trainer.profile_picture if trainer else None,
@@ -419,30 +456,29 @@ def get_available_clients(
             detail="Only trainers can access this endpoint"
         )
     
-    # Get all client IDs that already have threads with this trainer
-    existing_thread_clients = db.query(ChatThread.client_id).filter(
+    # Clients that already have an active thread with this trainer, as a correlated
+    # anti-join (served by idx_chat_threads_client_deleted) instead of an IN list
+    has_thread = exists().where(
+        ChatThread.client_id == User.id,
         ChatThread.trainer_id == user_id,
         ChatThread.deleted_at == None
-    ).all()
-    
-    existing_client_ids = [client_id for (client_id,) in existing_thread_clients]
+    )
     
     # Get all clients (role_id = 2) who don't have threads and are not deleted
     query = db.query(User).filter(
         User.role_id == 2,
         User.deleted_at == None,  # Only active clients
-        ~User.id.in_(existing_client_ids) if existing_client_ids else True
+        ~has_thread
     )
     
     # Apply search filter if provided
     if search:
         search_term = f"%{search}%"
+        # One LIKE over "first last email" instead of three ILIKEs: the columns use a
+        # case-insensitive collation, so MySQL needs no LOWER() per row, and a full
+        # name such as "Ana Horvat" now matches too
         query = query.filter(
-            or_(
-                User.first_name.ilike(search_term),
-                User.last_name.ilike(search_term),
-                User.email.ilike(search_term)
-            )
+            func.concat_ws(" ", User.first_name, User.last_name, User.email).like(search_term)
         )
     
     available_clients = query.order_by(User.first_name, User.last_name).all()
@@ -530,6 +566,11 @@ def get_total_unread_count(current_user=Depends(get_current_user), db: Session =
     user_id = current_user['user_id']
     user_role = current_user['role_id']
     
+    with _unread_cache_lock:
+        cached = _unread_cache.get(user_id)
+    if cached is not None:
+        return {"unread_count": cached}
+    
     if user_role == 2:  # Client
         # Count unread messages from trainer in client's thread
         # Only count if trainer is not deleted
@@ -567,10 +608,12 @@ def get_total_unread_count(current_user=Depends(get_current_user), db: Session =
     else:
         unread_count = 0
     
+    with _unread_cache_lock:
+        _unread_cache[user_id] = unread_count
     return {"unread_count": unread_count}
 
 @chat_router.post('/upload')
-async def upload_file(
+def upload_file(
     thread_id: int = Form(...),
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
@@ -625,8 +668,7 @@ async def upload_file(
         file_path = thread_upload_dir / unique_filename
         
         # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        _save_upload(file.file, file_path, file_size)
         
         # Return ONLY the filename to be stored in DB
         # The full path will be constructed when retrieving messages
@@ -677,8 +719,8 @@ def delete_thread(
             detail="Thread not found"
         )
     
-    # Soft delete
-    thread.deleted_at = datetime.utcnow()
+    # Soft delete, stamped from the database clock like the rest of the chat timestamps
+    thread.deleted_at = func.now()
     db.commit()
     
     return {"message": "Thread deleted successfully"}
\ No newline at end of file
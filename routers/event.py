@@ -1,7 +1,8 @@
 # routes/event.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import insert
+from database import get_db, get_read_db
 from auth.jwt import get_current_user, require_admin
 from models.event import Event, EventCopy, EventException, RepeatTypeEnum, RepeatEndTypeEnum, ExceptionTypeEnum
 from models.user import User
@@ -118,9 +119,9 @@ def calculate_previous_occurrence(event: Event, target_date: datetime) -> dateti
             current += timedelta(days=event.repeat_interval)
     
     elif event.repeat_type == RepeatTypeEnum.weekly:
-        if event.repeat_days:
+        if event.repeat_days_mask:
             # For weekly with specific days, find the last occurrence before target
-            allowed_weekdays = set(int(d) for d in event.repeat_days.split(','))
+            allowed_weekdays = event.repeat_days_mask
             week_number = 0
             
             while True:
@@ -133,7 +134,7 @@ def calculate_previous_occurrence(event: Event, target_date: datetime) -> dateti
                         check_date = week_start + timedelta(days=day_offset)
                         weekday = check_date.weekday()
                         
-                        if weekday in allowed_weekdays and event.start_time <= check_date < target_date:
+                        if allowed_weekdays & (1 << weekday) and event.start_time <= check_date < target_date:
                             occurrence = datetime(
                                 check_date.year,
                                 check_date.month,
@@ -202,9 +203,9 @@ def generate_repeat_instances(
     else:
         repeat_end = end_date
     
-    if event.repeat_type == RepeatTypeEnum.weekly and event.repeat_days:
-        # Handle weekly with specific days (e.g., Mon-Fri)
-        allowed_weekdays = set(int(d) for d in event.repeat_days.split(','))
+    if event.repeat_type == RepeatTypeEnum.weekly and event.repeat_days_mask:
+        # Handle weekly with specific days (e.g., Mon-Fri); bit N set = weekday N selected
+        allowed_weekdays = event.repeat_days_mask
         
         # FIXED: Count ALL week cycles, not just visible ones
         week_cycle_count = 0
@@ -235,7 +236,7 @@ def generate_repeat_instances(
                     weekday = check_date.weekday()  # 0=Monday, 6=Sunday
                     
                     # Check if this weekday is selected and within range
-                    if weekday in allowed_weekdays and check_date >= event.start_time:
+                    if allowed_weekdays & (1 << weekday) and check_date >= event.start_time:
                         instance_start = datetime(
                             check_date.year,
                             check_date.month,
@@ -412,7 +413,7 @@ def validate_repeat_days(repeat_days: Optional[str]) -> None:
 
 
 @event_router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
-async def create_event(
+def create_event(
     data: EventCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -496,13 +497,13 @@ async def create_event(
 
 
 @event_router.get("/", response_model=List[EventResponse])
-async def list_events(
+def list_events(
     user_id: Optional[int] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     include_repeating: bool = Query(True),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     timezone_offset: Optional[int] = Header(None, alias="X-Timezone-Offset")
 ):
     """List events with optional filters"""
@@ -533,25 +534,14 @@ async def list_events(
     elif end_date_utc:
         query = query.filter(Event.end_time <= end_date_utc)
     
-    events = query.order_by(Event.start_time).all()
-    
-    # FIXED: Preload all exceptions to avoid N+1 queries
-    event_ids = [e.id for e in events]
-    exceptions_list = db.query(EventException).filter(
-        EventException.event_id.in_(event_ids)
-    ).all() if event_ids else []
-    
-    # Group exceptions by event_id
-    exceptions_by_event: Dict[int, List[EventException]] = {}
-    for exc in exceptions_list:
-        if exc.event_id not in exceptions_by_event:
-            exceptions_by_event[exc.event_id] = []
-        exceptions_by_event[exc.event_id].append(exc)
+    expand_repeats = include_repeating and start_date_utc and end_date_utc
+    if expand_repeats:
+        # Batch-load exceptions and their modified events with IN (...) queries, only when expanding
+        query = query.options(
+            selectinload(Event.exceptions).selectinload(EventException.modified_event)
+        )
     
-    # FIXED: Preload all modified events
-    modified_event_ids = [exc.modified_event_id for exc in exceptions_list if exc.modified_event_id]
-    modified_events = db.query(Event).filter(Event.id.in_(modified_event_ids)).all() if modified_event_ids else []
-    modified_events_cache = {e.id: e for e in modified_events}
+    events = query.order_by(Event.start_time).all()
     
     result_events = []
     
@@ -560,8 +550,12 @@ async def list_events(
         event_dict = event_to_dict_with_timezone(event, timezone_offset)
         result_events.append(EventResponse(**event_dict))
         
-        if include_repeating and start_date_utc and end_date_utc and event.repeat_type != RepeatTypeEnum.none:
-            event_exceptions = exceptions_by_event.get(event.id, [])
+        if expand_repeats and event.repeat_type != RepeatTypeEnum.none:
+            event_exceptions = event.exceptions
+            modified_events_cache = {
+                exc.modified_event_id: exc.modified_event
+                for exc in event_exceptions if exc.modified_event_id
+            }
             instances = generate_repeat_instances(
                 event, start_date_utc, end_date_utc, timezone_offset, 
                 event_exceptions, modified_events_cache
@@ -572,10 +566,10 @@ async def list_events(
 
 
 @event_router.get("/{event_id}", response_model=EventWithUser)
-async def get_event(
+def get_event(
     event_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     timezone_offset: Optional[int] = Header(None, alias="X-Timezone-Offset")
 ):
     """Get details of a specific event"""
@@ -612,7 +606,7 @@ async def get_event(
 
 
 @event_router.patch("/{event_id}", response_model=EventResponse)
-async def update_event(
+def update_event(
     event_id: int,
     request_body: dict,
     current_user: dict = Depends(get_current_user),
@@ -827,7 +821,7 @@ async def update_event(
 
 
 @event_router.delete("/{event_id}")
-async def delete_event(
+def delete_event(
     event_id: int,
     request_body: dict,
     current_user: dict = Depends(get_current_user),
@@ -914,8 +908,31 @@ async def delete_event(
         )
 
 
+def bulk_materialize_copies(db: Session, event_id: int, rows: List[dict]) -> List[EventCopy]:
+    """
+    Insert EventCopy rows with a single multi-row INSERT instead of a flush per row.
+    MySQL has no RETURNING; a simple multi-row INSERT gets consecutive ids starting
+    at lastrowid, so exactly that id range is read back.
+    """
+    if not rows:
+        return []
+    
+    result = db.execute(insert(EventCopy.__table__).values(rows))
+    first_id = result.lastrowid
+    
+    copies = db.query(EventCopy).filter(
+        EventCopy.id.between(first_id, first_id + len(rows) - 1)
+    ).order_by(EventCopy.id).all()
+    
+    if len(copies) != len(rows):
+        # Non-consecutive ids (e.g. an unexpected autoinc lock mode); fail instead of guessing
+        raise RuntimeError(f"Expected {len(rows)} inserted event copies, read back {len(copies)}")
+    
+    return copies
+
+
 @event_router.post("/{event_id}/copy", response_model=EventCopyResponse, status_code=status.HTTP_201_CREATED)
-async def copy_event(
+def copy_event(
     event_id: int,
     data: EventCopyCreate,
     current_user: dict = Depends(get_current_user),
@@ -989,7 +1006,7 @@ async def copy_event(
 
 
 @event_router.post("/{event_id}/bulk-copy", response_model=List[EventCopyResponse], status_code=status.HTTP_201_CREATED)
-async def bulk_copy_event(
+def bulk_copy_event(
     event_id: int,
     data: EventBulkCopyCreate,
     current_user: dict = Depends(require_admin),
@@ -1016,47 +1033,43 @@ async def bulk_copy_event(
             detail="One or more target users not found"
         )
     
-    copies = []
+    event_rows = []
+    copy_rows = []
+    for user_id in data.target_user_ids:
+        for target_date in data.target_dates:
+            target_date_utc = convert_user_to_utc_timezone(target_date, timezone_offset)
+            time_diff = target_date_utc - event.start_time
+            
+            event_rows.append({
+                "user_id": user_id,
+                "title": event.title,
+                "description": event.description,
+                "start_time": event.start_time + time_diff,
+                "end_time": event.end_time + time_diff,
+                "all_day": event.all_day,
+                "repeat_type": RepeatTypeEnum.none,
+                "repeat_interval": 1,
+                "repeat_days_mask": 0,
+                "repeat_until": None,
+                "repeat_end_type": RepeatEndTypeEnum.never,
+                "repeat_count": None,
+                "created_by": current_user["user_id"],
+            })
+            copy_rows.append({
+                "event_id": event_id,
+                "user_id": user_id,
+                "date": target_date_utc,
+            })
     
     try:
-        for user_id in data.target_user_ids:
-            for target_date in data.target_dates:
-                target_date_utc = convert_user_to_utc_timezone(target_date, timezone_offset)
-                time_diff = target_date_utc - event.start_time
-                
-                new_event = Event(
-                    user_id=user_id,
-                    title=event.title,
-                    description=event.description,
-                    start_time=event.start_time + time_diff,
-                    end_time=event.end_time + time_diff,
-                    all_day=event.all_day,
-                    repeat_type=RepeatTypeEnum.none,
-                    repeat_interval=1,
-                    repeat_days=None,
-                    repeat_until=None,
-                    repeat_end_type=RepeatEndTypeEnum.never,
-                    repeat_count=None,
-                    created_by=current_user["user_id"]
-                )
-                db.add(new_event)
-                db.flush()
-                
-                event_copy = EventCopy(
-                    event_id=event_id,
-                    user_id=user_id,
-                    date=target_date_utc
-                )
-                db.add(event_copy)
-                db.flush()
-                copies.append(event_copy)
-        
+        # The cloned events' ids are never used, so they go out as one executemany
+        db.execute(insert(Event), event_rows)
+        copies = bulk_materialize_copies(db, event_id, copy_rows)
+        # Serialize before commit expires the rows, or each copy would reload on its own
+        response = [EventCopyResponse.model_validate(copy) for copy in copies]
         db.commit()
         
-        for copy in copies:
-            db.refresh(copy)
-        
-        return copies
+        return response
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -1066,10 +1079,10 @@ async def bulk_copy_event(
 
 
 @event_router.get("/{event_id}/copies", response_model=List[EventCopyResponse])
-async def get_event_copies(
+def get_event_copies(
     event_id: int,
     current_user: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all copies of an event (Admin only)"""
     
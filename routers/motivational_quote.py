@@ -3,8 +3,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, case
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List
+import threading
+from cachetools import TTLCache
 
 from database import get_db
 from auth.jwt import get_current_user, require_admin
@@ -19,6 +21,13 @@ from schema.motivational_quote import (
 
 quote_router = APIRouter(prefix="/quotes", tags=["Motivational Quotes"])
 
+# Today's quote, keyed by UTC date. The cache is per worker, so entries expire after
+# a minute and are then re-read from the persisted last_shown_at row: edits, deletes
+# and a racing pick at midnight on another worker are picked up within the TTL.
+# Cleared locally when a quote is edited or deleted.
+_daily_quote_cache = TTLCache(maxsize=2, ttl=60)
+_daily_quote_cache_lock = threading.Lock()
+
 
 @quote_router.get('/random', response_model=RandomQuoteResponse)
 def get_random_quote(
@@ -37,6 +46,12 @@ def get_random_quote(
     # Get current UTC date (without time)
     now = datetime.utcnow()
     today = now.date()
+    today_start = datetime.combine(today, datetime.min.time())
+    
+    with _daily_quote_cache_lock:
+        cached = _daily_quote_cache.get(today)
+    if cached:
+        return cached
     
     # Check if there's a quote already selected for today
     # We'll use a simple approach: check if any quote was last_shown_at today
@@ -44,18 +59,21 @@ def get_random_quote(
         and_(
             MotivationalQuote.is_active == True,
             MotivationalQuote.deleted_at == None,
-            func.date(MotivationalQuote.last_shown_at) == today
+            # Range on the raw column instead of DATE(last_shown_at) so no per-row cast
+            MotivationalQuote.last_shown_at >= today_start,
+            MotivationalQuote.last_shown_at < today_start + timedelta(days=1)
         )
-    ).first()
+    # If two workers raced at midnight, every worker settles on the earliest pick
+    ).order_by(MotivationalQuote.last_shown_at, MotivationalQuote.id).first()
     
     if todays_quote:
-        # Return the already selected quote for today
-        return RandomQuoteResponse(
+        # Return the already selected quote for today (picked by this or another worker)
+        return _cache_daily_quote(today, RandomQuoteResponse(
             id=todays_quote.id,
             quote=todays_quote.quote,
             author=todays_quote.author,
             times_shown=todays_quote.times_shown
-        )
+        ))
     
     # No quote selected for today yet, select a new one
     quotes = db.query(MotivationalQuote).filter(
@@ -115,12 +133,20 @@ def get_random_quote(
     db.commit()
     db.refresh(selected_quote)
     
-    return RandomQuoteResponse(
+    return _cache_daily_quote(today, RandomQuoteResponse(
         id=selected_quote.id,
         quote=selected_quote.quote,
         author=selected_quote.author,
         times_shown=selected_quote.times_shown
-    )
+    ))
+
+
+def _cache_daily_quote(today: date, response: RandomQuoteResponse) -> RandomQuoteResponse:
+    # Only today's entry is ever needed
+    with _daily_quote_cache_lock:
+        _daily_quote_cache.clear()
+        _daily_quote_cache[today] = response
+    return response
 
 
 @quote_router.get('/', response_model=List[MotivationalQuoteResponse])
@@ -205,6 +231,8 @@ def update_quote(
         quote.is_active = quote_data.is_active
     
     db.commit()
+    with _daily_quote_cache_lock:
+        _daily_quote_cache.clear()
     db.refresh(quote)
     
     return quote
@@ -231,6 +259,8 @@ def delete_quote(
     # Soft delete
     quote.deleted_at = datetime.utcnow()
     db.commit()
+    with _daily_quote_cache_lock:
+        _daily_quote_cache.clear()
     
     return {"message": f"Quote {quote_id} deleted successfully"}
 
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime, timedelta
 from database import get_db
 from auth.jwt import get_current_user
 from models.user import User
@@ -169,10 +169,12 @@ def create_day_rating(
             detail="User not found"
         )
     
-    today = date.today()
+    today_start = datetime.combine(date.today(), datetime.min.time())
     existing_rating = db.query(DayRating).filter(
         DayRating.user_id == target_user_id,
-        func.date(DayRating.created_at) == today
+        # Range on the raw column instead of DATE(created_at) so no per-row cast
+        DayRating.created_at >= today_start,
+        DayRating.created_at < today_start + timedelta(days=1)
     ).first()
 
     if existing_rating:
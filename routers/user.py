@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
 from typing import Optional, List
 from decimal import Decimal
 from datetime import datetime
 from pydantic import BaseModel
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from passlib.context import CryptContext
+from auth.password import pwd_context
 
 from database import get_db
 from auth.jwt import get_current_user, require_admin
@@ -14,7 +15,7 @@ from models.user import User
 from models.weight_tracking import WeightTracking
 from schema.weight_tracking import WeightTrackingCreate, WeightTrackingUpdate, WeightTrackingResponse
 from functions.upload import upload_profile_image
-from functions.send_mail import send_password_reset_email, generate_reset_token, get_reset_token_expiry
+from functions.send_mail import queue_password_reset_email, generate_reset_token, get_reset_token_expiry
 from models.user import User
 
 
@@ -22,7 +23,34 @@ import logging
 logger = logging.getLogger("chosen_api")
 
 user_router = APIRouter(prefix="/user", tags=["User"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _questionnaire_status(db: Session, user_id: int):
+    """
+    Return (needs_questionnaire_update, birthday) for a user.
+    The completeness check runs in MySQL (JSON_TYPE/JSON_LENGTH on work_shifts)
+    so the routine Text columns and the work_shifts JSON are never shipped or parsed.
+    """
+    from models.questionnaire import UserQuestionnaire
+    q = UserQuestionnaire
+    complete = and_(
+        q.weight != None,
+        q.height != None,
+        q.birthday != None,
+        q.workout_environment != None,
+        func.json_type(q.work_shifts) != "NULL",
+        func.json_length(q.work_shifts) > 0,
+        q.wake_up_time != None,
+        q.sleep_time != None,
+        q.morning_routine != None,
+        q.evening_routine != None
+    )
+    row = db.query(q.birthday, complete.label("complete")).filter(q.user_id == user_id).first()
+    if not row:
+        # No questionnaire at all
+        return True, None
+    # NULL (a NULL work_shifts column) counts as incomplete
+    return not row.complete, row.birthday
 
 
 @user_router.get('/me')
@@ -30,30 +58,7 @@ def get_current_user(current_user=Depends(get_current_user), db: Session = Depen
     user = db.query(User).filter(User.id == current_user['user_id'], User.deleted_at == None).first()
     
     # Check questionnaire status
-    from models.questionnaire import UserQuestionnaire
-    questionnaire = db.query(UserQuestionnaire).filter(
-        UserQuestionnaire.user_id == user.id
-    ).first()
-    
-    needs_questionnaire_update = False
-    if questionnaire:
-        # Check if any required fields are null
-        needs_questionnaire_update = (
-            questionnaire.weight is None or
-            questionnaire.height is None or
-            questionnaire.birthday is None or
-            questionnaire.workout_environment is None or
-            questionnaire.work_shifts is None or
-            len(questionnaire.work_shifts or []) == 0 or
-            questionnaire.wake_up_time is None or
-            questionnaire.sleep_time is None or
-            questionnaire.morning_routine is None or
-            questionnaire.evening_routine is None
-        )
-    else:
-        # No questionnaire at all
-        needs_questionnaire_update = True
-    birthdate = questionnaire.birthday if questionnaire else None
+    needs_questionnaire_update, birthdate = _questionnaire_status(db, user.id)
     return {
         "user_id": user.id,
         "role_id": user.role_id,
@@ -92,28 +97,7 @@ def get_user_by_id(
         )
     
     # Check questionnaire status
-    from models.questionnaire import UserQuestionnaire
-    questionnaire = db.query(UserQuestionnaire).filter(
-        UserQuestionnaire.user_id == user.id
-    ).first()
-    
-    needs_questionnaire_update = False
-    if questionnaire:
-        needs_questionnaire_update = (
-            questionnaire.weight is None or
-            questionnaire.height is None or
-            questionnaire.birthday is None or
-            questionnaire.workout_environment is None or
-            questionnaire.work_shifts is None or
-            len(questionnaire.work_shifts or []) == 0 or
-            questionnaire.wake_up_time is None or
-            questionnaire.sleep_time is None or
-            questionnaire.morning_routine is None or
-            questionnaire.evening_routine is None
-        )
-    else:
-        needs_questionnaire_update = True
-    birthdate = questionnaire.birthday if questionnaire else None
+    needs_questionnaire_update, birthdate = _questionnaire_status(db, user.id)
     return {
         "user_id": user.id,
         "role_id": user.role_id,
@@ -375,8 +359,8 @@ def request_password_reset(
     user.reset_token_expires_at = get_reset_token_expiry(hours=24)
     db.commit()
 
-    # Send password reset email
-    send_password_reset_email(
+    # Queue password reset email for the email worker
+    queue_password_reset_email(
         first_name=user.first_name,
         email=user.email,
         reset_token=reset_token
@@ -412,8 +396,8 @@ def admin_reset_password(
     user.reset_token_expires_at = get_reset_token_expiry(hours=24)
     db.commit()
 
-    # Send password reset email
-    send_password_reset_email(
+    # Queue password reset email for the email worker
+    queue_password_reset_email(
         first_name=user.first_name,
         email=user.email,
         reset_token=reset_token
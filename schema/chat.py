@@ -46,7 +46,7 @@ class ChatMessageUpdate(BaseModel):
 class ChatMessageCreate(BaseModel):
     thread_id: int = Field(..., description="Thread ID")
     body: str = Field(..., description="Message content")
-    image_url: Optional[str] = Field(None, description="File URL if message has attachment")
+    image_url: Optional[str] = Field(None, max_length=255, description="File URL if message has attachment")
 
 class ChatMessageResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)